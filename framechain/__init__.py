@@ -1,6 +1,2 @@
 from framechain.ops import *
-from framechain.embedding_models import *
-from framechain.segmentation_models import *
-from framechain.sequential_models import *
 from framechain.schema import *
-from framechain.ops import *
@@ -0,0 +1,93 @@
+import json
+import threading
+from typing import Optional
+
+from framechain.schema import CompositeRunnable, Runnable, RunInput, RunOutput, type_id_of
+from framechain.utils.deadline import Deadline, current_deadline, deadline_scope
+
+
+class Skip(Runnable):
+    """A no-op that passes its inputs through, eg. as the fallback for an optional branch."""
+
+    def serialize(self) -> str:
+        return json.dumps({"type_id": type_id_of(type(self))})
+
+    @classmethod
+    def deserialize(cls, text: str) -> "Skip":
+        return cls()
+
+    def _run(self, inputs: RunInput | None) -> RunOutput | None:
+        return inputs
+
+
+class Degradable(CompositeRunnable):
+    """
+    Runs the best of several interchangeable runnables that fits in the current deadline.
+
+    `runnables` are ordered from preferred to cheapest, eg. a `Resize` to the full target
+    size followed by one to half of it. Each option's expected cost is a moving average of
+    its measured run time, seeded from `costs` (seconds, None if unknown). With no deadline
+    the first option always runs; otherwise the first one expected to finish in the
+    remaining budget runs, or the last (cheapest) one if none is. An option whose cost is
+    still unknown is assumed to fit so that it gets measured. Each time an option is passed
+    over for not fitting, its estimate shrinks by `decay`, so one that was only slow for a
+    while (eg. while the machine was busy) is tried, and re-measured, again eventually.
+
+    Example:
+        ```python
+        chain = Degradable(Resize(width=1024, height=1024), Resize(width=512, height=512)) | GaussianBlur(radius=2)
+        chain = chain | optional(UnsharpMask(radius=2, percent=150, threshold=3), cost=0.05)
+        chain.run(input=image, deadline=0.1)
+        ```
+    """
+
+    def __init__(self, *runnables: Runnable, costs: Optional[list[Optional[float]]] = None, decay: float = 0.1, **kwargs):
+        super().__init__(*runnables, **kwargs)
+        if not 0.0 <= decay < 1.0:
+            raise ValueError("decay must be in [0, 1)")
+        self.costs = costs  # the seed costs, kept for `serialize`
+        self.decay = decay
+        if costs is not None:
+            if len(costs) != len(self.runnables):
+                raise ValueError("costs must have one entry per runnable")
+            for i, cost in enumerate(costs):
+                self._costs[i].value = cost
+        self._local = threading.local()  # one chain may run on several threads, eg. under `DeadlineScheduler`
+
+    @property
+    def last_choice(self) -> Optional[int]:
+        """The index of the option used by the latest run on the calling thread."""
+        return getattr(self._local, "choice", None)
+
+    def _serialize_kwargs(self) -> dict:
+        return {"costs": self.costs, "decay": self.decay}
+
+    def choose(self, deadline: Optional[Deadline]) -> int:
+        """The index of the option to run under `deadline`."""
+        if not self.runnables:
+            raise ValueError("Degradable needs at least one runnable")
+        if deadline is None:
+            return 0
+        remaining = deadline.remaining()
+        last = len(self.runnables) - 1
+        for i in range(last):
+            estimate = self._costs[i]
+            if estimate.value is None or estimate.value <= remaining:
+                return i
+            estimate.value *= 1.0 - self.decay
+        return last
+
+    def _run(self, inputs: RunInput | None) -> RunOutput | None:
+        deadline = current_deadline()
+        self._local.choice = choice = self.choose(deadline)
+        return self._finalize(self._run_child(choice, inputs, deadline))
+
+    async def arun(self, *, deadline: Deadline | float | None = None, **inputs: RunInput) -> RunOutput | None:
+        with deadline_scope(deadline) as deadline:
+            self._local.choice = choice = self.choose(deadline)
+            return self._finalize(await self._arun_child(choice, inputs, deadline))
+
+
+def optional(runnable: Runnable, cost: Optional[float] = None) -> Degradable:
+    """Wrap `runnable` so it is skipped when it is not expected to fit in the deadline."""
+    return Degradable(runnable, Skip(), costs=[cost, 0.0])
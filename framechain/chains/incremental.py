@@ -0,0 +1,204 @@
+import hashlib
+from collections import OrderedDict
+from typing import Any, NamedTuple, Optional
+
+import numpy as np
+import PIL.Image
+from pydantic import BaseModel
+
+from framechain.schema import CompositeRunnable, Runnable, RunInput, RunOutput, SequentialRunnables
+from framechain.utils.image_type import image_nbytes
+from framechain.utils.types import Image
+
+
+class ChainStep(NamedTuple):
+    """One node of a flattened chain plus the precision handling of the composites around it."""
+
+    node: Runnable
+    prepare: list[tuple[CompositeRunnable, Runnable]]  # `composite._prepare(child, ...)` calls to make before `node` runs, outermost first
+    finalize: list[CompositeRunnable]  # composites whose `_finalize` runs after `node`, innermost first
+
+    def run(self, inputs: RunInput) -> RunOutput | None:
+        for composite, child in self.prepare:
+            inputs = composite._prepare(child, inputs)
+        outputs = self.node.run(**inputs)
+        for composite in self.finalize:
+            outputs = composite._finalize(outputs)
+        return outputs
+
+
+def flatten_chain(runnable: Runnable) -> list[ChainStep]:
+    """Flatten nested `SequentialRunnables` into the steps they run in order."""
+    if not isinstance(runnable, SequentialRunnables):
+        return [ChainStep(runnable, [], [])]
+    steps: list[ChainStep] = []
+    for child in runnable.runnables:
+        child_steps = flatten_chain(child)
+        if child_steps:
+            first = child_steps[0]
+            child_steps[0] = first._replace(prepare=[(runnable, child), *first.prepare])
+            steps.extend(child_steps)
+    if steps:
+        steps[-1] = steps[-1]._replace(finalize=[*steps[-1].finalize, runnable])
+    return steps
+
+
+def is_cacheable(runnable: Runnable) -> bool:
+    """Whether a node's output may be memoized, ie. it has no side effects such as writing files."""
+    if isinstance(runnable, CompositeRunnable):
+        return all(is_cacheable(child) for child in runnable.runnables)
+    return getattr(runnable, "cacheable", True)
+
+
+def config_key(runnable: Runnable) -> str:
+    """A string that changes whenever a node's type or parameters change."""
+    name = f"{type(runnable).__module__}.{type(runnable).__qualname__}"
+    if isinstance(runnable, CompositeRunnable):
+        return f"{name}({','.join(config_key(child) for child in runnable.runnables)})"
+    if isinstance(runnable, BaseModel):
+        try:
+            return f"{name}{runnable.model_dump_json()}"
+        except Exception:
+            return f"{name}{runnable.model_dump()!r}"
+    # not a pydantic model, so the best we can do is assume it never changes
+    return f"{name}@{id(runnable)}"
+
+
+def step_key(step: ChainStep) -> str:
+    """`config_key` of the step's node plus the precision policies applied around it."""
+    policies = [composite.precision for composite, _ in step.prepare] + [composite.precision for composite in step.finalize]
+    return config_key(step.node) + "".join(policy.model_dump_json() if policy is not None else "-" for policy in policies)
+
+
+def _value_digest(value: Any) -> bytes:
+    if isinstance(value, np.ndarray):
+        return hashlib.blake2b(np.ascontiguousarray(value).data, digest_size=16).digest() + repr((value.shape, value.dtype.str)).encode()
+    if isinstance(value, PIL.Image.Image):
+        return hashlib.blake2b(value.tobytes(), digest_size=16).digest() + repr((value.size, value.mode)).encode()
+    return repr(value).encode()
+
+
+def _output_images(outputs: RunOutput | None) -> dict[int, Image]:
+    if not outputs:
+        return {}
+    return {id(v): v for v in outputs.values() if isinstance(v, (np.ndarray, PIL.Image.Image))}
+
+
+class IncrementalSession:
+    """
+    Runs a chain repeatedly, recomputing only the nodes whose inputs or parameters changed.
+
+    Each node's output is cached under a key derived from the session inputs and the
+    `config_key` of that node and every node before it. After a parameter tweak, eg.
+    `blur.radius = 3`, the next `run` resumes from the last node whose key is unchanged.
+    Cached outputs are evicted least-recently-used first to stay under `memory_budget`
+    bytes of image data.
+
+    Nodes with side effects, such as `ImageSink` and `DatasetWriter` (see `BaseChain.cacheable`),
+    run on every `run`, and so does every node after them; only the nodes before the first
+    of them are memoized.
+
+    Inputs are fingerprinted by content once per object; mutating an input image in place
+    between runs is not detected, so pass a new image instead. `run` returns a new dict, but
+    the images in it are shared with the cache and should not be mutated either.
+
+    Example:
+        ```python
+        blur = GaussianBlur(radius=2)
+        session = IncrementalSession(Resize(width=2048, height=2048) | blur | AdjustContrast(factor=1.2))
+        session.run(input=image)
+        blur.radius = 3
+        session.run(input=image)  # only reruns GaussianBlur and AdjustContrast
+        ```
+    """
+
+    def __init__(self, chain: Runnable, *, memory_budget: int = 1024 * 1024 * 1024):
+        self.chain = chain
+        self.memory_budget = memory_budget
+        self.last_recomputed: int = 0  # number of nodes that ran during the last `run`
+        self._cache: OrderedDict[str, tuple[RunOutput | None, list[int]]] = OrderedDict()
+        # ops pass their inputs through, so one image is often held by many entries; charge it once
+        self._image_refs: dict[int, list[int]] = {}  # id(image) -> [entries holding it, nbytes]
+        self._cached_bytes = 0
+        self._input_digests: dict[int, tuple[Any, bytes]] = {}
+
+    @property
+    def cached_bytes(self) -> int:
+        return self._cached_bytes
+
+    def clear(self) -> None:
+        self._cache.clear()
+        self._image_refs.clear()
+        self._cached_bytes = 0
+        self._input_digests.clear()
+
+    def _inputs_key(self, inputs: RunInput) -> str:
+        digests: dict[int, tuple[Any, bytes]] = {}
+        h = hashlib.blake2b(digest_size=16)
+        for name in sorted(inputs):
+            value = inputs[name]
+            cached = self._input_digests.get(id(value))
+            # keep a reference to the value so its id() cannot be reused by another object
+            digest = cached[1] if cached is not None and cached[0] is value else _value_digest(value)
+            digests[id(value)] = (value, digest)
+            h.update(name.encode() + b"=" + digest + b";")
+        self._input_digests = digests
+        return h.hexdigest()
+
+    def _evict(self, key: str) -> None:
+        _, image_ids = self._cache.pop(key)
+        for image_id in image_ids:
+            refs = self._image_refs[image_id]
+            refs[0] -= 1
+            if refs[0] == 0:
+                self._cached_bytes -= refs[1]
+                del self._image_refs[image_id]
+
+    def _store(self, key: str, outputs: RunOutput | None) -> None:
+        images = _output_images(outputs)
+        new_nbytes = sum(image_nbytes(image) for image_id, image in images.items() if image_id not in self._image_refs)
+        if new_nbytes > self.memory_budget:
+            return
+        if key in self._cache:
+            self._evict(key)
+        for image_id, image in images.items():
+            if image_id in self._image_refs:
+                self._image_refs[image_id][0] += 1
+            else:
+                nbytes = image_nbytes(image)
+                self._image_refs[image_id] = [1, nbytes]
+                self._cached_bytes += nbytes
+        self._cache[key] = (outputs, list(images))
+        while self._cached_bytes > self.memory_budget and self._cache:
+            self._evict(next(iter(self._cache)))
+
+    def run(self, **inputs: RunInput) -> RunOutput | None:
+        steps = flatten_chain(self.chain)
+
+        keys: list[str] = []
+        previous = self._inputs_key(inputs)
+        for step in steps:
+            previous = hashlib.blake2b(f"{previous}|{step_key(step)}".encode(), digest_size=16).hexdigest()
+            keys.append(previous)
+
+        # nodes with side effects, and everything after them, run every time
+        cached_steps = next((i for i, step in enumerate(steps) if not is_cacheable(step.node)), len(steps))
+
+        # resume after the deepest node whose output is still cached
+        start = 0
+        outputs: Optional[RunOutput] = inputs
+        for i in reversed(range(cached_steps)):
+            if keys[i] in self._cache:
+                self._cache.move_to_end(keys[i])
+                outputs = self._cache[keys[i]][0]
+                start = i + 1
+                break
+
+        for i in range(start, len(steps)):
+            outputs = steps[i].run(outputs)
+            if i < cached_steps:
+                self._store(keys[i], outputs)
+
+        self.last_recomputed = len(steps) - start
+        # a copy, so callers cannot change what the next run gets from the cache
+        return None if outputs is None else dict(outputs)
@@ -0,0 +1,82 @@
+import heapq
+import itertools
+import math
+import os
+import threading
+from concurrent.futures import Future
+from typing import Optional
+
+from framechain.schema import Runnable, RunInput
+from framechain.utils.deadline import Deadline, DeadlineExceeded
+
+
+class DeadlineScheduler:
+    """
+    Runs chains on a pool of threads, earliest deadline first.
+
+    Work without a deadline runs after all work that has one, in submission order. Each
+    run gets its deadline passed through `Runnable.run`, so `Degradable` nodes can fall
+    back to cheaper options when a request has waited in the queue. With `drop_expired`
+    requests whose deadline passed before they started fail with `DeadlineExceeded`
+    instead of running.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, *, drop_expired: bool = False):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.drop_expired = drop_expired
+        self._queue: list[tuple[float, int, Future, Runnable, Optional[Deadline], RunInput]] = []
+        self._counter = itertools.count()
+        self._condition = threading.Condition()
+        self._shutdown = False
+        self._threads = [threading.Thread(target=self._work, daemon=True) for _ in range(self.max_workers)]
+        for thread in self._threads:
+            thread.start()
+
+    def __len__(self) -> int:
+        """The number of requests waiting to start."""
+        with self._condition:
+            return len(self._queue)
+
+    def submit(self, runnable: Runnable, *, deadline: Deadline | float | None = None, **inputs: RunInput) -> Future:
+        if deadline is not None and not isinstance(deadline, Deadline):
+            deadline = Deadline.after(deadline)
+        future: Future = Future()
+        with self._condition:
+            if self._shutdown:
+                raise RuntimeError("Cannot submit to a scheduler that has been shut down")
+            priority = deadline.at if deadline is not None else math.inf
+            heapq.heappush(self._queue, (priority, next(self._counter), future, runnable, deadline, inputs))
+            self._condition.notify()
+        return future
+
+    def _work(self) -> None:
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._queue or self._shutdown)
+                if not self._queue:
+                    return
+                _, _, future, runnable, deadline, inputs = heapq.heappop(self._queue)
+            if not future.set_running_or_notify_cancel():
+                continue
+            if self.drop_expired and deadline is not None and deadline.expired():
+                future.set_exception(DeadlineExceeded(f"Deadline passed {-deadline.remaining():.4f}s before the run started"))
+                continue
+            try:
+                future.set_result(runnable.run(deadline=deadline, **inputs))
+            except Exception as e:
+                future.set_exception(e)
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop accepting work. Queued work still runs; `wait` blocks until it has."""
+        with self._condition:
+            self._shutdown = True
+            self._condition.notify_all()
+        if wait:
+            for thread in self._threads:
+                thread.join()
+
+    def __enter__(self) -> "DeadlineScheduler":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.shutdown()
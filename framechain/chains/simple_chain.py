@@ -1,8 +1,8 @@
-from abc import abstractmethod
 from typing import Generic, Optional, TypeVar
 
-from pydantic import validator
-from framechain.schema import BaseChain, Image, ImageType, RunInput, RunOutput, Size, convert_format
+from pydantic import model_validator
+from framechain.schema import BaseChain, RunInput, RunOutput
+from framechain.utils.types import Image
 from framechain.utils.scale import ScalingMode, scale
 from typingx import isinstancex
 
@@ -11,7 +11,7 @@ from framechain.utils.image_type import convert_type
 
 T = TypeVar('T')
 
-class SimpleChain(Generic[T], BaseChain):
+class SimpleChain(BaseChain, Generic[T]):
     """
     A chain that processes 1 input image and returns 1 output image.
     """
@@ -19,24 +19,19 @@ class SimpleChain(Generic[T], BaseChain):
     input_name: str = "input"
     output_name: str = "output"
     
-    @validator('inputs', pre=True, always=True)
-    def default_inputs(cls, v):
-        if not v:
-            return [cls.input_name]
-        return v
-
-    @validator('outputs', pre=True, always=True)
-    def default_outputs(cls, v):
-        if not v:
-            return [cls.output_name]
-        return v
+    @model_validator(mode="after")
+    def _default_inputs_and_outputs(self):
+        if not self.inputs:
+            self.inputs = [self.input_name]
+        if not self.outputs:
+            self.outputs = [self.output_name]
+        return self
     
     def _run(self, inputs: RunInput | None, **kwargs) -> RunOutput | None:
         input = inputs[self.input_name]
         output = self._process_input(input, **kwargs)
         return {self.output_name: output}
     
-    @abstractmethod
     def _process_input(self, input: T, **kwargs) -> T:
         return input
 
@@ -0,0 +1,54 @@
+import argparse
+from typing import Optional
+
+from framechain.serve.server import ChainServer
+
+
+def _serve(args: argparse.Namespace) -> None:
+    with open(args.chain) as f:
+        chain_text = f.read()
+    try:
+        server = ChainServer(
+            args.chain_class,
+            chain_text,
+            host=args.host,
+            port=args.port,
+            workers=args.workers,
+            max_queue_depth=args.max_queue_depth,
+            request_timeout=args.timeout,
+            input_name=args.input_name,
+            output_name=args.output_name,
+            verbose=args.verbose,
+        )
+    except (ImportError, AttributeError, TypeError, ValueError) as e:
+        raise SystemExit(f"framechain serve: cannot load {args.chain_class} chain from {args.chain}: {e}")
+    print(f"Serving {args.chain_class} from {args.chain} on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(prog="framechain")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    serve = subparsers.add_parser("serve", help="Serve a serialized chain over HTTP")
+    serve.add_argument("chain", help="Path to the serialized chain")
+    serve.add_argument("--chain-class", required=True, help="Class to deserialize the chain with, eg. framechain.ops:GaussianBlur, or framechain.schema:SequentialRunnables for a chain built with |")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8000)
+    serve.add_argument("--workers", type=int, default=None, help="Worker processes (default: one per CPU)")
+    serve.add_argument("--max-queue-depth", type=int, default=64, help="Requests in flight before new ones get a 503")
+    serve.add_argument("--timeout", type=float, default=None, help="Seconds before a request gets a 504")
+    serve.add_argument("--input-name", default="input")
+    serve.add_argument("--output-name", default="output")
+    serve.add_argument("--verbose", action="store_true", help="Log every request")
+    serve.set_defaults(func=_serve)
+
+    args = parser.parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,306 @@
+import json
+import math
+import os
+import shutil
+import tempfile
+from typing import BinaryIO, Iterable, Iterator, Optional
+
+import numpy as np
+
+from framechain.chains.simple_chain import SimpleChain
+from framechain.schema import RunInput, RunOutput
+from framechain.utils.image_type import ImageType, convert_type
+from framechain.utils.types import Image
+
+INDEX_FILENAME = "index.json"
+DATASET_VERSION = 1
+
+BucketShape = tuple[int, int, int]  # (H, W, C)
+
+
+def bucket_shape_for(shape: tuple[int, ...], granularity: int) -> BucketShape:
+    """Round an image's height and width up to the next multiple of `granularity`."""
+    h, w, c = shape
+    return (math.ceil(h / granularity) * granularity, math.ceil(w / granularity) * granularity, c)
+
+
+def bucket_filename(shape: BucketShape) -> str:
+    h, w, c = shape
+    return f"bucket_{h}x{w}x{c}.bin"
+
+
+def _as_hwc_uint8(image: Image) -> np.ndarray:
+    array = convert_type(image, ImageType.np)
+    if array.ndim == 2:
+        array = array[:, :, None]
+    if array.dtype != np.uint8:
+        raise ValueError(f"NHWC datasets store uint8 images, got {array.dtype}")
+    return array
+
+
+class NHWCDataset:
+    """
+    A read-only, memory-mapped image dataset.
+
+    On disk a dataset is a directory holding an `index.json` and one raw uint8 NHWC file
+    per bucket. Images are zero-padded up to their bucket's (H, W) and the index records
+    each image's id, bucket, slot and true shape. Indexing returns views into the memory
+    map, so random access and slicing never copy or decode pixel data.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        # resolve the link a writer publishes through once, so the index and buckets come from the same version
+        path = os.path.realpath(path)
+        with open(os.path.join(path, INDEX_FILENAME)) as f:
+            index = json.load(f)
+        if index["version"] != DATASET_VERSION:
+            raise ValueError(f"Unsupported dataset version: {index['version']}")
+        self.items: list[dict] = index["items"]
+        self.buckets: list[np.ndarray] = [
+            np.memmap(os.path.join(path, bucket["file"]), dtype=np.uint8, mode="r", shape=(bucket["count"], *bucket["shape"]))
+            for bucket in index["buckets"]
+        ]
+        self._positions = {item["id"]: i for i, item in enumerate(self.items)}
+
+    @property
+    def ids(self) -> list[str]:
+        return [item["id"] for item in self.items]
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def __getitem__(self, key: int | str | slice) -> np.ndarray | list[np.ndarray]:
+        if isinstance(key, slice):
+            return [self[i] for i in range(*key.indices(len(self)))]
+        if isinstance(key, str):
+            key = self._positions[key]
+        item = self.items[key]
+        h, w, c = item["shape"]
+        return self.buckets[item["bucket"]][item["slot"], :h, :w, :c]
+
+    def __iter__(self) -> Iterator[np.ndarray]:
+        for i in range(len(self)):
+            yield self[i]
+
+
+class NHWCDatasetWriter:
+    """
+    Writes images to a new `NHWCDataset` directory.
+
+    Everything is written to a hidden sibling directory, and `close` publishes it by
+    atomically replacing `path` with a symlink to it once the index is complete. Readers of
+    `path` therefore see either the previous dataset or the finished new one, never a
+    half-written one or nothing, and an overwritten dataset leaves no stale bucket files
+    behind. The one exception is overwriting a plain directory (eg. a dataset from an
+    older writer), which has to be moved aside before the link can take its place.
+    """
+
+    def __init__(self, path: str, *, bucket_granularity: int = 64, overwrite: bool = False):
+        if bucket_granularity < 1:
+            raise ValueError("bucket_granularity must be at least 1")
+        path = os.path.abspath(path)
+        if os.path.exists(path):
+            if os.path.exists(os.path.join(path, INDEX_FILENAME)):
+                if not overwrite:
+                    raise FileExistsError(f"A dataset already exists at {path}")
+            elif not os.path.isdir(path) or os.listdir(path):
+                raise FileExistsError(f"{path} exists and is not a dataset")
+        parent, name = os.path.split(path)
+        os.makedirs(parent, exist_ok=True)
+        self.path = path
+        self._tmp_path = tempfile.mkdtemp(prefix=f".{name}.", dir=parent)  # published as is, `path` links to it
+        self.bucket_granularity = bucket_granularity
+        self._bucket_ids: dict[BucketShape, int] = {}
+        self._bucket_counts: list[int] = []
+        self._bucket_shapes: list[BucketShape] = []
+        self._files: list[BinaryIO] = []
+        self._items: list[dict] = []
+        self._ids: set[str] = set()
+        self.closed = False
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def append(self, image: Image, id: Optional[str] = None) -> int:
+        """Append `image` and return its position in the dataset."""
+        if self.closed:
+            raise ValueError("Cannot append to a closed dataset writer")
+        array = _as_hwc_uint8(image)
+        id = id if id is not None else str(len(self._items))
+        if id in self._ids:
+            raise ValueError(f"Duplicate image id: {id}")
+
+        image_shape = array.shape
+        shape = bucket_shape_for(image_shape, self.bucket_granularity)
+        if shape not in self._bucket_ids:
+            self._bucket_ids[shape] = len(self._bucket_shapes)
+            self._bucket_shapes.append(shape)
+            self._bucket_counts.append(0)
+            self._files.append(open(os.path.join(self._tmp_path, bucket_filename(shape)), "wb"))
+        bucket = self._bucket_ids[shape]
+
+        if array.shape != shape:
+            padded = np.zeros(shape, dtype=np.uint8)
+            padded[: image_shape[0], : image_shape[1]] = array
+            array = padded
+        self._files[bucket].write(np.ascontiguousarray(array).data)
+
+        self._items.append({"id": id, "bucket": bucket, "slot": self._bucket_counts[bucket], "shape": list(image_shape)})
+        self._bucket_counts[bucket] += 1
+        self._ids.add(id)
+        return len(self._items) - 1
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        for f in self._files:
+            f.close()
+        index = {
+            "version": DATASET_VERSION,
+            "buckets": [
+                {"file": bucket_filename(shape), "shape": list(shape), "count": count}
+                for shape, count in zip(self._bucket_shapes, self._bucket_counts)
+            ],
+            "items": self._items,
+        }
+        with open(os.path.join(self._tmp_path, INDEX_FILENAME), "w") as f:
+            json.dump(index, f)
+
+        parent, name = os.path.split(self.path)
+        old_path = None
+        if os.path.islink(self.path):
+            previous = os.path.realpath(self.path)
+            if os.path.dirname(previous) == parent and os.path.basename(previous).startswith(f".{name}."):
+                old_path = previous  # a version published by an earlier writer
+        elif os.path.isdir(self.path):
+            old_path = tempfile.mkdtemp(prefix=f".{name}.", suffix=".old", dir=parent)
+            os.replace(self.path, old_path)
+
+        link_path = f"{self._tmp_path}.link"
+        os.symlink(os.path.basename(self._tmp_path), link_path)
+        os.replace(link_path, self.path)  # renaming over the old link is atomic
+        if old_path is not None:
+            # readers that already opened the old version keep their memory maps
+            shutil.rmtree(old_path, ignore_errors=True)
+        self.closed = True
+
+    def abort(self) -> None:
+        """Discard everything written so far, leaving any existing dataset untouched."""
+        if self.closed:
+            return
+        for f in self._files:
+            f.close()
+        shutil.rmtree(self._tmp_path, ignore_errors=True)
+        self.closed = True
+
+    def __enter__(self) -> "NHWCDatasetWriter":
+        return self
+
+    def __exit__(self, exc_type, *exc_info) -> None:
+        if exc_type is not None:
+            self.abort()
+        else:
+            self.close()
+
+
+class DatasetReader(SimpleChain):
+    """
+    A source chain that looks up images in an `NHWCDataset` by position or id.
+
+    `iter_batches` yields lists of input dicts for `Runnable.run_batch` / `Runnable.stream`,
+    the same shape as `ImageSource.iter_batches`, so a chain can switch between decoding
+    compressed files and reading a pre-decoded dataset without other changes.
+    """
+
+    output_name: str = "input"  # feeds straight into the default `input_name` of downstream ops
+
+    path: str
+    batch_size: int = 32
+    id_name: Optional[str] = "id"  # also emit each image's id under this key, if set
+
+    _dataset: Optional[NHWCDataset] = None
+
+    @property
+    def dataset(self) -> NHWCDataset:
+        if self._dataset is None:
+            self._dataset = NHWCDataset(self.path)
+        return self._dataset
+
+    def _process_input(self, input: int | str, **kwargs) -> np.ndarray:
+        return self.dataset[input]
+
+    def iter_batches(self, keys: Optional[Iterable[int | str]] = None) -> Iterator[list[RunInput]]:
+        """Yield batches for `keys` (every image, in order, by default)."""
+        if self.batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        keys = range(len(self.dataset)) if keys is None else keys
+        batch: list[RunInput] = []
+        for key in keys:
+            inputs = {self.output_name: self.dataset[key]}
+            if self.id_name is not None:
+                inputs[self.id_name] = key if isinstance(key, str) else self.dataset.items[key]["id"]
+            batch.append(inputs)
+            if len(batch) == self.batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+
+class DatasetWriter(SimpleChain):
+    """
+    A sink chain that appends its input image to an `NHWCDataset` and outputs its position.
+
+    If `id_name` is present in the run inputs it is used as the image id. Call `close`
+    (or use the chain as a context manager) to publish the dataset once all images are in.
+    """
+
+    cacheable = False  # every run appends an image
+
+    input_name: str = "output"  # upstream ops keep their input and add their result under "output"
+    output_name: str = "index"
+
+    path: str
+    bucket_granularity: int = 64
+    overwrite: bool = False
+    id_name: Optional[str] = "id"
+
+    _writer: Optional[NHWCDatasetWriter] = None
+
+    @property
+    def writer(self) -> NHWCDatasetWriter:
+        if self._writer is None:
+            self._writer = NHWCDatasetWriter(self.path, bucket_granularity=self.bucket_granularity, overwrite=self.overwrite)
+        return self._writer
+
+    def _run(self, inputs: RunInput | None, **kwargs) -> RunOutput | None:
+        id = inputs.get(self.id_name) if self.id_name is not None else None
+        index = self.writer.append(inputs[self.input_name], id=None if id is None else str(id))
+        return {self.output_name: index}
+
+    def write_batches(self, batches: Iterable[list[RunInput]]) -> int:
+        """Append every image in `batches`, eg. the output of `Runnable.stream`, and return the count."""
+        count = 0
+        for batch in batches:
+            for outputs in batch:
+                self.run(**outputs)
+                count += 1
+        return count
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+
+    def abort(self) -> None:
+        if self._writer is not None:
+            self._writer.abort()
+
+    def __enter__(self) -> "DatasetWriter":
+        return self
+
+    def __exit__(self, exc_type, *exc_info) -> None:
+        if exc_type is not None:
+            self.abort()
+        else:
+            self.close()
@@ -0,0 +1,202 @@
+import io
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from enum import Enum
+from typing import Any, Optional
+
+import numpy as np
+import PIL.Image
+
+from framechain.chains.simple_chain import SimpleChain
+from framechain.utils.image_type import ImageType, cast_image, convert_type, image_nbytes
+from framechain.utils.types import Image
+
+
+class ImageFormat(Enum):
+    JPEG = "JPEG"
+    PNG = "PNG"
+    WEBP = "WEBP"
+    NPY = "NPY"
+
+
+FORMAT_EXTENSIONS: dict[ImageFormat, str] = {
+    ImageFormat.JPEG: "jpg",
+    ImageFormat.PNG: "png",
+    ImageFormat.WEBP: "webp",
+    ImageFormat.NPY: "npy",
+}
+
+# keyword arguments passed to `PIL.Image.Image.save` for each preset
+FORMAT_PRESETS: dict[str, dict[ImageFormat, dict[str, Any]]] = {
+    "fast": {
+        ImageFormat.JPEG: {"quality": 85},
+        ImageFormat.PNG: {"compress_level": 1},
+        ImageFormat.WEBP: {"quality": 80, "method": 0},
+        ImageFormat.NPY: {},
+    },
+    "balanced": {
+        ImageFormat.JPEG: {"quality": 90, "optimize": True},
+        ImageFormat.PNG: {"compress_level": 6},
+        ImageFormat.WEBP: {"quality": 85, "method": 4},
+        ImageFormat.NPY: {},
+    },
+    "small": {
+        ImageFormat.JPEG: {"quality": 75, "optimize": True, "progressive": True},
+        ImageFormat.PNG: {"compress_level": 9, "optimize": True},
+        ImageFormat.WEBP: {"quality": 75, "method": 6},
+        ImageFormat.NPY: {},
+    },
+    "lossless": {
+        ImageFormat.JPEG: {"quality": 100, "subsampling": 0},
+        ImageFormat.PNG: {"compress_level": 6},
+        ImageFormat.WEBP: {"lossless": True, "method": 4},
+        ImageFormat.NPY: {},
+    },
+}
+
+
+def encode_image(image: Image, /, format: ImageFormat, **options) -> bytes:
+    """Encode `image` to bytes. `options` are passed to `PIL.Image.Image.save` (or ignored for NPY)."""
+    buffer = io.BytesIO()
+    if format == ImageFormat.NPY:
+        np.save(buffer, convert_type(image, ImageType.np), allow_pickle=False)
+        return buffer.getvalue()
+    image = convert_type(image, ImageType.PIL)
+    if format == ImageFormat.JPEG and image.mode not in ("L", "RGB", "CMYK"):
+        image = image.convert("RGB")
+    image.save(buffer, format=format.value, **options)
+    return buffer.getvalue()
+
+
+class ImageSink(SimpleChain):
+    """
+    A sink stage that encodes chain outputs and writes them on a thread pool.
+
+    Running the sink returns immediately with the destination index under `output_name`;
+    encoding and writing happen in the background. At most `max_inflight_bytes` of decoded
+    pixel data is held by pending writes, after which `run` blocks until some complete.
+    Call `flush` (or use the sink as a context manager) to wait for all pending writes.
+
+    Images are written to `directory` as `filename_template` files and/or into a
+    memory-mapped uint8 NHWC `.npy` file at `mmap_path` with shape `mmap_shape`.
+    """
+
+    cacheable = False  # every run writes an image
+
+    input_name: str = "output"  # upstream ops keep their input and add their result under "output"
+    output_name: str = "index"
+
+    directory: Optional[str] = None
+    filename_template: str = "{index:08d}.{ext}"
+    format: ImageFormat = ImageFormat.PNG
+    preset: str = "balanced"
+    options: dict[str, Any] = {}  # overrides for the preset's save options
+
+    mmap_path: Optional[str] = None
+    mmap_shape: Optional[tuple[int, int, int, int]] = None  # (N, H, W, C)
+
+    max_workers: Optional[int] = None
+    max_inflight_bytes: int = 256 * 1024 * 1024
+
+    _executor: Optional[ThreadPoolExecutor] = None
+    _mmap: Optional[np.ndarray] = None
+    _condition: Optional[threading.Condition] = None
+    _inflight_bytes: int = 0
+    _next_index: int = 0
+    _pending: set[Future] = set()
+    _error: Optional[BaseException] = None
+    _closed: bool = False
+
+    def model_post_init(self, __context) -> None:
+        if self.directory is None and self.mmap_path is None:
+            raise ValueError("ImageSink needs a directory, an mmap_path, or both")
+        if self.mmap_path is not None and self.mmap_shape is None:
+            raise ValueError("mmap_shape is required when mmap_path is set")
+        if self.preset not in FORMAT_PRESETS:
+            raise ValueError(f"Unknown preset: {self.preset}. Choose from {list(FORMAT_PRESETS)}")
+        self._condition = threading.Condition()
+        self._pending = set()
+
+    @property
+    def save_options(self) -> dict[str, Any]:
+        return {**FORMAT_PRESETS[self.preset][self.format], **self.options}
+
+    def _process_input(self, input: Image, **kwargs) -> int:
+        nbytes = image_nbytes(input)
+        with self._condition:
+            if self._closed:
+                # reopening the memory map would truncate everything written so far
+                raise ValueError("Cannot write to a closed ImageSink")
+            if self._executor is None:
+                # under the lock, so concurrent first runs cannot open the memory map with w+ twice
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers)
+                if self.directory is not None:
+                    os.makedirs(self.directory, exist_ok=True)
+                if self.mmap_path is not None:
+                    self._mmap = np.lib.format.open_memmap(self.mmap_path, mode="w+", dtype=np.uint8, shape=self.mmap_shape)
+            # always admit a single oversized image, otherwise it would wait forever
+            self._condition.wait_for(lambda: self._error is not None or self._inflight_bytes == 0 or self._inflight_bytes + nbytes <= self.max_inflight_bytes)
+            self._raise_pending_error()
+            index = self._next_index
+            self._next_index += 1
+            self._inflight_bytes += nbytes
+
+        future = self._executor.submit(self._write, input, index)
+        with self._condition:
+            self._pending.add(future)
+        future.add_done_callback(lambda f: self._on_done(f, nbytes))
+        return index
+
+    def _write(self, image: Image, index: int) -> None:
+        if self._mmap is not None:
+            array = cast_image(convert_type(image, ImageType.np), np.uint8)
+            if array.ndim == 2:
+                array = array[:, :, None]
+            if array.shape != self._mmap.shape[1:]:
+                # assigning would silently broadcast, eg. one channel into all three
+                raise ValueError(f"Image {index} has shape {array.shape}, expected {self._mmap.shape[1:]} to fit mmap_shape")
+            self._mmap[index] = array
+        if self.directory is not None:
+            data = encode_image(image, format=self.format, **self.save_options)
+            filename = self.filename_template.format(index=index, ext=FORMAT_EXTENSIONS[self.format])
+            with open(os.path.join(self.directory, filename), "wb") as f:
+                f.write(data)
+
+    def _on_done(self, future: Future, nbytes: int) -> None:
+        with self._condition:
+            self._pending.discard(future)
+            self._inflight_bytes -= nbytes
+            if not future.cancelled() and future.exception() is not None and self._error is None:
+                self._error = future.exception()
+            self._condition.notify_all()
+
+    def _raise_pending_error(self) -> None:
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+
+    def flush(self) -> None:
+        """Block until every pending write has finished, re-raising the first write error."""
+        with self._condition:
+            self._condition.wait_for(lambda: not self._pending)
+            if self._mmap is not None:
+                self._mmap.flush()
+            self._raise_pending_error()
+
+    def close(self) -> None:
+        """Flush pending writes and release the worker pool and memory map. The sink cannot be reused."""
+        self._closed = True
+        try:
+            self.flush()
+        finally:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
+            self._mmap = None
+
+    def __enter__(self) -> "ImageSink":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
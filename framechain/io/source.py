@@ -0,0 +1,107 @@
+import io
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from os import PathLike
+from typing import Iterable, Iterator, Optional
+
+import PIL.Image
+
+from framechain.chains.simple_chain import SimpleChain
+from framechain.schema import Runnable, RunInput, SequentialRunnables
+from framechain.utils.types import Image, Size
+
+ImageSourceItem = str | PathLike | bytes | bytearray | memoryview
+
+
+def decode_image(item: ImageSourceItem, /, *, draft_size: Optional[Size] = None, mode: Optional[str] = None) -> PIL.Image.Image:
+    """Decode a path or an encoded byte blob into a fully loaded PIL image.
+
+    If `draft_size` (height, width) is given, JPEGs are decoded with the DCT scaling of
+    `PIL.Image.Image.draft`, which yields the smallest power-of-two reduction that is still
+    at least as large as `draft_size`. Other formats ignore the hint and decode at full size.
+    """
+    if isinstance(item, (bytes, bytearray, memoryview)):
+        item = io.BytesIO(item)
+    image = PIL.Image.open(item)
+    if draft_size is not None:
+        h, w = draft_size
+        image.draft(mode, (int(w), int(h)))
+    image.load()
+    if mode is not None and image.mode != mode:
+        image = image.convert(mode)
+    return image
+
+
+def infer_draft_size(runnable: Runnable) -> Optional[Size]:
+    """Return the (height, width) a chain immediately resizes its input to, if known ahead of time.
+
+    Only a leading `Resize` is considered: any op before it (eg. a `Crop`) works in full
+    resolution pixel coordinates, so draft decoding would change its result.
+    """
+    from framechain.ops import Resize
+
+    if isinstance(runnable, Resize):
+        return (runnable.height, runnable.width)
+    if isinstance(runnable, SequentialRunnables) and runnable.runnables:
+        return infer_draft_size(runnable.runnables[0])
+    return None
+
+
+class ImageSource(SimpleChain):
+    """
+    A source stage that decodes image paths or byte blobs into PIL images.
+
+    As a chain it decodes the single item under `input_name`, so it can be composed
+    with `|` like any other chain. For bulk ingest use `iter_images` or `iter_batches`,
+    which decode on a thread pool while keeping at most `prefetch` items in flight.
+
+    Example:
+        ```python
+        chain = Resize(width=512, height=512, output_name="input") | GaussianBlur(radius=2)
+        source = ImageSource(draft_size=infer_draft_size(chain), batch_size=16)
+        for outputs in chain.stream(source.iter_batches(paths)):
+            ...
+        ```
+    """
+
+    output_name: str = "input"  # feeds straight into the default `input_name` of downstream ops
+
+    draft_size: Optional[Size] = None  # (height, width) the downstream chain scales to
+    mode: Optional[str] = None  # PIL mode to convert to after decoding, eg. "RGB"
+    max_workers: Optional[int] = None
+    prefetch: int = 32
+    batch_size: int = 32
+
+    def _process_input(self, input: ImageSourceItem, **kwargs) -> Image:
+        return decode_image(input, draft_size=self.draft_size, mode=self.mode)
+
+    def iter_images(self, items: Iterable[ImageSourceItem]) -> Iterator[Image]:
+        """Decode `items` in parallel and yield the images in input order."""
+        if self.prefetch < 1:
+            raise ValueError("prefetch must be at least 1")
+        items = iter(items)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            pending: deque[Future] = deque()
+            try:
+                for item in items:
+                    pending.append(executor.submit(self._process_input, item))
+                    if len(pending) >= self.prefetch:
+                        yield pending.popleft().result()
+                while pending:
+                    yield pending.popleft().result()
+            finally:
+                for future in pending:
+                    future.cancel()
+
+    def iter_batches(self, items: Iterable[ImageSourceItem]) -> Iterator[list[RunInput]]:
+        """Decode `items` in parallel and yield lists of input dicts for `Runnable.run_batch`."""
+        if self.batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        batch: list[RunInput] = []
+        for image in self.iter_images(items):
+            batch.append({self.output_name: image})
+            if len(batch) == self.batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
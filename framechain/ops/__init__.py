@@ -4,8 +4,14 @@ from framechain.chains.simple_chain import SimpleChain
 from framechain.schema import RunInput, RunOutput
 from framechain.utils.types import Image
 from framechain.utils.channel_format import ChannelFormat, convert_channel_format
+from framechain.utils.image_type import ImageType
 
-class AdjustBrightness(SimpleChain):
+class PILChain(SimpleChain):
+    """Base for the ops implemented with PIL, which only work on 8 bit images."""
+    supported_dtypes = ("uint8",)
+    supported_types = (ImageType.PIL,)
+
+class AdjustBrightness(PILChain):
     factor: float
     
     def _run(self, inputs: RunInput | None) -> RunOutput | None:
@@ -14,7 +20,7 @@ class AdjustBrightness(SimpleChain):
         output_image = enhancer.enhance(self.factor)
         return {**inputs, self.output_name: output_image}
 
-class AdjustColor(SimpleChain):
+class AdjustColor(PILChain):
     factor: float
     
     def _run(self, inputs: RunInput | None) -> RunOutput | None:
@@ -23,7 +29,7 @@ class AdjustColor(SimpleChain):
         output_image = enhancer.enhance(self.factor)
         return {**inputs, self.output_name: output_image}
 
-class AdjustContrast(SimpleChain):
+class AdjustContrast(PILChain):
     factor: float
     
     def _run(self, inputs: RunInput | None) -> RunOutput | None:
@@ -32,7 +38,7 @@ class AdjustContrast(SimpleChain):
         output_image = enhancer.enhance(self.factor)
         return {**inputs, self.output_name: output_image}
 
-class AdjustSharpness(SimpleChain):
+class AdjustSharpness(PILChain):
     factor: float
     
     def _run(self, inputs: RunInput | None) -> RunOutput | None:
@@ -41,7 +47,7 @@ class AdjustSharpness(SimpleChain):
         output_image = enhancer.enhance(self.factor)
         return {**inputs, self.output_name: output_image}
 
-class Crop(SimpleChain):
+class Crop(PILChain):
     left: int
     top: int
     right: int
@@ -52,25 +58,25 @@ class Crop(SimpleChain):
         output_image = input_image.crop((self.left, self.top, self.right, self.bottom))
         return {**inputs, self.output_name: output_image}
 
-class EdgeDetection(SimpleChain):
+class EdgeDetection(PILChain):
     def _run(self, inputs: RunInput | None) -> RunOutput | None:
         input_image = inputs[self.input_name]
         output_image = input_image.filter(ImageFilter.FIND_EDGES)
         return {**inputs, self.output_name: output_image}
 
-class Emboss(SimpleChain):
+class Emboss(PILChain):
     def _run(self, inputs: RunInput | None) -> RunOutput | None:
         input_image = inputs[self.input_name]
         output_image = input_image.filter(ImageFilter.EMBOSS)
         return {**inputs, self.output_name: output_image}
 
-class Equalize(SimpleChain):
+class Equalize(PILChain):
     def _run(self, inputs: RunInput | None) -> RunOutput | None:
         input_image = inputs[self.input_name]
         output_image = ImageOps.equalize(input_image)
         return {**inputs, self.output_name: output_image}
 
-class Flip(SimpleChain):
+class Flip(PILChain):
     horizontal: bool = True
     
     def _run(self, inputs: RunInput | None) -> RunOutput | None:
@@ -81,7 +87,7 @@ class Flip(SimpleChain):
             output_image = input_image.transpose(Image.FLIP_TOP_BOTTOM)
         return {**inputs, self.output_name: output_image}
 
-class GaussianBlur(SimpleChain):
+class GaussianBlur(PILChain):
     radius: float
     
     def _run(self, inputs: RunInput | None) -> RunOutput | None:
@@ -90,13 +96,13 @@ class GaussianBlur(SimpleChain):
         return {**inputs, self.output_name: output_image}
 
 
-class Greyscale(SimpleChain):
+class Greyscale(PILChain):
     def _run(self, inputs: RunInput | None) -> RunOutput | None:
         input_image = inputs[self.input_name]
         output_image = convert_channel_format(input_image, to=ChannelFormat.L)
         return {**inputs, self.output_name: output_image}
 
-class Posterize(SimpleChain):
+class Posterize(PILChain):
     bits: int
     
     def _run(self, inputs: RunInput | None) -> RunOutput | None:
@@ -104,7 +110,7 @@ class Posterize(SimpleChain):
         output_image = ImageOps.posterize(input_image, self.bits)
         return {**inputs, self.output_name: output_image}
 
-class Resize(SimpleChain):
+class Resize(PILChain):
     width: int
     height: int
     
@@ -113,7 +119,7 @@ class Resize(SimpleChain):
         output_image = input_image.resize((self.width, self.height))
         return {**inputs, self.output_name: output_image}
 
-class Rotate(SimpleChain):
+class Rotate(PILChain):
     angle: float
     
     def _run(self, inputs: RunInput | None) -> RunOutput | None:
@@ -121,7 +127,7 @@ class Rotate(SimpleChain):
         output_image = input_image.rotate(self.angle)
         return {**inputs, self.output_name: output_image}
 
-class Solarize(SimpleChain):
+class Solarize(PILChain):
     threshold: int
     
     def _run(self, inputs: RunInput | None) -> RunOutput | None:
@@ -129,7 +135,7 @@ class Solarize(SimpleChain):
         output_image = ImageOps.solarize(input_image, self.threshold)
         return {**inputs, self.output_name: output_image}
 
-class UnsharpMask(SimpleChain):
+class UnsharpMask(PILChain):
     radius: float
     percent: int
     threshold: int
@@ -1,28 +1,41 @@
+import asyncio
+import importlib
+import json
+import time
+from collections import defaultdict
 from enum import Enum
-from typing import Callable, Literal, Optional, Self
-from framechain.chains.functional import FunctionalChain
+from typing import Callable, ClassVar, Iterable, Iterator, Literal, Optional, Self
 from abc import ABC, abstractmethod
 
 import stringcase
 import numpy as np
-from pydantic import BaseModel
+from pydantic import BaseModel, model_validator
 from framechain.utils.channel_format import convert_channel_format
 
 from framechain.utils.image_type import ImageType, convert_type
+from framechain.utils.deadline import CostEstimate, Deadline, current_deadline, deadline_scope
+from framechain.utils.precision import PrecisionPolicy, declared_names
 from framechain.utils.types import Image
 
 
 class Serializable(ABC, BaseModel):
-    type_id: str  # should be unique for each model and remain constant
-    version: str  # should be updated when the model changes
-    meta: dict  # should contain any additional information about the model schema itself (not instance data)
+    type_id: str = ""  # should be unique for each model and remain constant
+    version: str = "0.1.0"  # should be updated when the model changes
+    meta: dict = {}  # should contain any additional information about the model schema itself (not instance data)
+
+    @model_validator(mode="before")
+    @classmethod
+    def _default_type_id(cls, data):
+        if isinstance(data, dict) and not data.get("type_id"):
+            data = {**data, "type_id": f"{cls.__module__}.{cls.__qualname__}"}
+        return data
 
     @abstractmethod
     def serialize(self) -> str:
         pass
 
-    @abstractmethod
     @classmethod
+    @abstractmethod
     def deserialize(self, text: str) -> Self:
         pass
 
@@ -31,23 +44,63 @@ RunInput = dict
 RunOutput = dict
 
 
+def type_id_of(cls: type) -> str:
+    return f"{cls.__module__}.{cls.__qualname__}"
+
+
+def import_type_id(type_id: str) -> type:
+    """Import the class a `type_id` (`module.path.QualName`) names."""
+    parts = type_id.split(".")
+    for i in range(len(parts) - 1, 0, -1):
+        try:
+            obj = importlib.import_module(".".join(parts[:i]))
+        except ImportError:
+            continue
+        for attr in parts[i:]:
+            obj = getattr(obj, attr)
+        return obj
+    raise ImportError(f"Cannot import {type_id}")
+
+
+def deserialize_runnable(data: dict) -> "Runnable":
+    """Rebuild a runnable from its parsed `serialize()` output, dispatching on its `type_id`."""
+    cls = import_type_id(data["type_id"])
+    if not (isinstance(cls, type) and issubclass(cls, Runnable)):
+        raise TypeError(f"{data['type_id']} is not a Runnable")
+    return cls.deserialize(json.dumps(data))
+
+
 class Runnable(ABC):
 
-    def run(self, **inputs: RunInput) -> RunOutput | None:
+    def run(self, *, deadline: Deadline | float | None = None, **inputs: RunInput) -> RunOutput | None:
+        """Runs the chain. `deadline` (a `Deadline` or seconds from now) applies to every nested run."""
+        with deadline_scope(deadline):
 
-        possible_new_inputs = self.pre_run(inputs=inputs)
-        if possible_new_inputs is not None:
-            inputs = possible_new_inputs
+            possible_new_inputs = self.pre_run(inputs=inputs)
+            if possible_new_inputs is not None:
+                inputs = possible_new_inputs
 
-        outputs = self._run(inputs=inputs)
+            outputs = self._run(inputs=inputs)
 
-        possible_new_outputs = self.post_run(inputs=inputs, outputs=outputs)
-        if possible_new_outputs is not None:
-            outputs = possible_new_outputs
+            possible_new_outputs = self.post_run(inputs=inputs, outputs=outputs)
+            if possible_new_outputs is not None:
+                outputs = possible_new_outputs
 
-        return outputs
+            return outputs
+
+    async def arun(self, *, deadline: Deadline | float | None = None, **inputs: RunInput) -> RunOutput | None:
+        """Async version of `run`. By default runs `run` in a worker thread."""
+        return await asyncio.to_thread(self.run, deadline=deadline, **inputs)
+
+    def run_batch(self, batch: list[RunInput]) -> list[RunOutput | None]:
+        """Runs each input dict in `batch` and returns the outputs in the same order."""
+        return [self.run(**inputs) for inputs in batch]
+
+    def stream(self, batches: Iterable[list[RunInput]]) -> Iterator[list[RunOutput | None]]:
+        """Lazily runs an iterable of batches, eg. the batches yielded by an `ImageSource`."""
+        for batch in batches:
+            yield self.run_batch(batch)
 
-    @abstractmethod
     def pre_run(self, inputs: RunInput | None) -> RunInput | None:
         """Called before the main _run method. Good place for logging, validation, etc."""
         return inputs
@@ -57,7 +110,6 @@ class Runnable(ABC):
         """The main method that does the work. Should be overridden by subclasses."""
         raise NotImplementedError(f"{self.__class__.__name__} does not implement _run")
 
-    @abstractmethod
     def post_run(
         self, inputs: RunInput | None, outputs: RunOutput | None
     ) -> RunOutput | None:
@@ -76,19 +128,98 @@ class Runnable(ABC):
 
 class CompositeRunnable(Runnable):
     runnables: list[Runnable]
+    precision: Optional[PrecisionPolicy] = None
 
-    def __init__(self, *runnables: list[Runnable], **kwargs):
+    def __init__(self, *runnables: list[Runnable], precision: Optional[PrecisionPolicy] = None, **kwargs):
         if "runnables" in kwargs:
-            runnables = kwargs["runnables"]
-        super().__init__(runnables=runnables, **kwargs)
+            runnables = kwargs.pop("runnables")
+        super().__init__(**kwargs)
+        self.runnables = list(runnables)
+        self.precision = precision
+        self._costs: defaultdict[int, CostEstimate] = defaultdict(CostEstimate)  # measured run time of each child
+
+    @property
+    def supported_types(self) -> Optional[tuple[ImageType, ...]]:
+        """The image types accepted by the children that see this composite's inputs."""
+        for runnable in self.runnables:
+            types = getattr(runnable, "supported_types", None)
+            if types is not None:
+                return types
+        return None
+
+    def _serialize_kwargs(self) -> dict:
+        """Constructor arguments besides the runnables and precision, for `serialize`."""
+        return {}
+
+    def serialize(self) -> str:
+        """Serialize the composite and its children, which must be serializable too."""
+        return json.dumps({
+            "type_id": type_id_of(type(self)),
+            "runnables": [json.loads(runnable.serialize()) for runnable in self.runnables],
+            "precision": None if self.precision is None else self.precision.model_dump(),
+            **self._serialize_kwargs(),
+        })
+
+    @classmethod
+    def deserialize(cls, text: str) -> "CompositeRunnable":
+        data = json.loads(text)
+        composite_cls = import_type_id(data.pop("type_id", type_id_of(cls)))
+        if not (isinstance(composite_cls, type) and issubclass(composite_cls, cls)):
+            raise TypeError(f"{type_id_of(composite_cls)} is not a {cls.__name__}")
+        runnables = [deserialize_runnable(runnable) for runnable in data.pop("runnables")]
+        precision = data.pop("precision", None)
+        return composite_cls(*runnables, precision=None if precision is None else PrecisionPolicy(**precision), **data)
+
+    def _prepare(self, runnable: Runnable, inputs: RunInput) -> RunInput:
+        if self.precision is None:
+            return inputs
+        return self.precision.prepare(runnable, inputs)
+
+    def _finalize(self, outputs: RunOutput | None) -> RunOutput | None:
+        if self.precision is None:
+            return outputs
+        return self.precision.finalize(outputs, declared_names(self, "outputs"))
+
+    def _child_deadline(self, i: int, deadline: Optional[Deadline]) -> Optional[Deadline]:
+        """The deadline for child `i` when children run one after another: the overall
+        deadline minus the expected cost of the children still to run after it."""
+        if deadline is None:
+            return None
+        reserved = sum(self._costs[j].value or 0.0 for j in range(i + 1, len(self.runnables)))
+        return Deadline(deadline.at - reserved)
+
+    def _run_child(self, i: int, inputs: RunInput, deadline: Optional[Deadline]) -> RunOutput | None:
+        runnable = self.runnables[i]
+        start = time.monotonic()
+        outputs = runnable.run(deadline=deadline, **self._prepare(runnable, inputs))
+        self._costs[i].update(time.monotonic() - start)
+        return outputs
+
+    async def _arun_child(self, i: int, inputs: RunInput, deadline: Optional[Deadline]) -> RunOutput | None:
+        runnable = self.runnables[i]
+        start = time.monotonic()
+        outputs = await runnable.arun(deadline=deadline, **self._prepare(runnable, inputs))
+        self._costs[i].update(time.monotonic() - start)
+        return outputs
 
 
 class SequentialRunnables(CompositeRunnable):
 
-    def _run(self, **kwargs) -> dict | None:
-        for runnable in self.runnables:
-            kwargs = runnable(**kwargs)
-        return kwargs
+    @property
+    def supported_types(self) -> Optional[tuple[ImageType, ...]]:
+        return getattr(self.runnables[0], "supported_types", None) if self.runnables else None
+
+    def _run(self, inputs: RunInput | None) -> RunOutput | None:
+        deadline = current_deadline()
+        for i in range(len(self.runnables)):
+            inputs = self._run_child(i, inputs, self._child_deadline(i, deadline))
+        return self._finalize(inputs)
+
+    async def arun(self, *, deadline: Deadline | float | None = None, **inputs: RunInput) -> RunOutput | None:
+        with deadline_scope(deadline) as deadline:
+            for i in range(len(self.runnables)):
+                inputs = await self._arun_child(i, inputs, self._child_deadline(i, deadline))
+            return self._finalize(inputs)
 
     def __or__(self, other):
         self.runnables.append(other)
@@ -97,13 +228,22 @@ class SequentialRunnables(CompositeRunnable):
 
 class ParallelRunnables(CompositeRunnable):
 
-    def _run(self, **kwargs) -> dict | None:
-        new_kwargs = {}
-        for runnable in self.runnables:
-            updates = runnable(**kwargs)
-            new_kwargs.update(updates)
-            # FIXME: make this actually parallel when i implement async support
-        return new_kwargs
+    def _run(self, inputs: RunInput | None) -> RunOutput | None:
+        # branches run one after another here, so budget them like a sequence; use `arun` to run them concurrently
+        deadline = current_deadline()
+        outputs = {}
+        for i in range(len(self.runnables)):
+            updates = self._run_child(i, inputs, self._child_deadline(i, deadline))
+            outputs.update(updates)
+        return self._finalize(outputs)
+
+    async def arun(self, *, deadline: Deadline | float | None = None, **inputs: RunInput) -> RunOutput | None:
+        with deadline_scope(deadline) as deadline:
+            results = await asyncio.gather(*(self._arun_child(i, inputs, deadline) for i in range(len(self.runnables))))
+            outputs = {}
+            for updates in results:
+                outputs.update(updates)
+            return self._finalize(outputs)
 
     def __and__(self, other):
         self.runnables.append(other)
@@ -112,12 +252,23 @@ class ParallelRunnables(CompositeRunnable):
 
 class BaseChain(Runnable, Serializable, ABC):
 
-    inputs: list[str]
-    outputs: list[str]
-    
+    inputs: list[str] = []
+    outputs: list[str] = []
+    supported_dtypes: ClassVar[Optional[tuple[str, ...]]] = None  # dtypes `_run` accepts, None for any
+    supported_types: ClassVar[Optional[tuple[ImageType, ...]]] = None  # image types `_run` accepts, None for any
+    cacheable: ClassVar[bool] = True  # False for chains with side effects, eg. sinks, whose runs must not be memoized
+
+    def serialize(self) -> str:
+        return self.model_dump_json()
+
+    @classmethod
+    def deserialize(cls, text: str) -> Self:
+        return cls.model_validate_json(text)
 
     @classmethod
     def from_func(cls, **kwargs):
+        from framechain.chains.functional import FunctionalChain
+
         def dec(func: Callable):
             name = kwargs.get('name', stringcase.camelcase(f"{func.__name__}{cls.__name__}"))
             bases = kwargs.get('bases', (FunctionalChain, cls))
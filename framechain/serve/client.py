@@ -0,0 +1,70 @@
+import json
+import urllib.request
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+
+from framechain.serve.server import read_shared_memory, write_shared_memory
+from framechain.utils.image_type import ImageType, convert_type
+from framechain.utils.types import Image
+
+
+class ChainClient:
+    """
+    Client for a `ChainServer`.
+
+    With `use_shared_memory` (the default, for clients on the same machine) the image is
+    handed over in a shared memory segment and only a small JSON descriptor goes over HTTP.
+    Otherwise the raw pixels are sent as the request body. Either way nothing is encoded.
+    """
+
+    def __init__(self, url: str, *, use_shared_memory: bool = True, timeout: float | None = None):
+        self.url = url.rstrip("/")
+        self.use_shared_memory = use_shared_memory
+        self.timeout = timeout
+
+    def run(self, image: Image, *, deadline: float | None = None, **names: str) -> np.ndarray:
+        """Run the served chain on `image`. `input_name`/`output_name` override the server's defaults.
+
+        `deadline` is in seconds from when the server receives the request.
+        """
+        array = np.ascontiguousarray(convert_type(image, ImageType.np))
+        if deadline is not None:
+            names["deadline_ms"] = str(deadline * 1000)
+        if not self.use_shared_memory:
+            request = urllib.request.Request(
+                f"{self.url}/run",
+                data=array.tobytes(),
+                headers={
+                    "Content-Type": "application/octet-stream",
+                    "X-Shape": json.dumps(list(array.shape)),
+                    "X-Dtype": array.dtype.str,
+                    **{f"X-{name.replace('_', '-').title()}": value for name, value in names.items()},
+                },
+            )
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                shape = json.loads(response.headers["X-Shape"])
+                return np.frombuffer(response.read(), dtype=np.dtype(response.headers["X-Dtype"])).reshape(shape)
+
+        shm = SharedMemory(create=True, size=max(array.nbytes, 1))
+        write_shared_memory(shm, array)
+        try:
+            body = {"shm": shm.name, "shape": list(array.shape), "dtype": array.dtype.str, **names}
+            request = urllib.request.Request(f"{self.url}/run", data=json.dumps(body).encode(), headers={"Content-Type": "application/json"})
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                result = json.loads(response.read())
+        finally:
+            shm.close()
+            shm.unlink()
+
+        # the server leaves its output segment for us to unlink
+        output_shm = SharedMemory(name=result["shm"])
+        try:
+            return read_shared_memory(output_shm, result["shape"], result["dtype"])
+        finally:
+            output_shm.close()
+            output_shm.unlink()
+
+    def stats(self) -> dict:
+        with urllib.request.urlopen(f"{self.url}/stats", timeout=self.timeout) as response:
+            return json.loads(response.read())
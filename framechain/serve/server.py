@@ -0,0 +1,377 @@
+import importlib
+import json
+import os
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Optional
+
+import numpy as np
+
+from framechain.chains.scheduler import DeadlineScheduler
+from framechain.schema import Runnable, RunInput, RunOutput
+from framechain.utils.deadline import Deadline
+from framechain.utils.image_type import ImageType, convert_type
+
+
+def import_string(path: str) -> Any:
+    """Import `module.path:QualName` (or `module.path.QualName`) and return the object."""
+    module_name, _, qualname = path.partition(":") if ":" in path else path.rpartition(".")
+    obj = importlib.import_module(module_name)
+    for attr in qualname.split("."):
+        obj = getattr(obj, attr)
+    return obj
+
+
+def untracked_shared_memory(name: Optional[str] = None, *, create: bool = False, size: int = 0) -> SharedMemory:
+    """Open a segment without registering it with this process's resource tracker.
+
+    Segments always belong to the client, which unlinks them once a request is done; if a
+    worker registered them, its resource tracker would unlink them again at shutdown.
+    Before python 3.13 this patches the tracker module, so only call it from the
+    single-threaded worker processes.
+    """
+    if sys.version_info >= (3, 13):
+        return SharedMemory(name=name, create=create, size=size, track=False)
+    register = resource_tracker.register
+    resource_tracker.register = lambda name, rtype: None
+    try:
+        return SharedMemory(name=name, create=create, size=size)
+    finally:
+        resource_tracker.register = register
+
+
+def write_shared_memory(shm: SharedMemory, array: np.ndarray) -> None:
+    np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)[...] = array
+
+
+def read_shared_memory(shm: SharedMemory, shape: list[int], dtype: str) -> np.ndarray:
+    """Copy an array out of `shm` so the segment can be closed."""
+    return np.array(np.ndarray(tuple(shape), dtype=np.dtype(dtype), buffer=shm.buf))
+
+
+# the chain each worker process keeps warm between requests
+_chain = None
+
+
+def load_chain(chain_class: str, chain_text: str) -> Runnable:
+    """Deserialize `chain_text` with `chain_class`, raising TypeError if that does not give a Runnable."""
+    cls = import_string(chain_class)
+    deserialize = getattr(cls, "deserialize", None)
+    if deserialize is None:
+        raise TypeError(f"{chain_class} has no deserialize method")
+    chain = deserialize(chain_text)
+    if not isinstance(chain, Runnable):
+        raise TypeError(f"{chain_class}.deserialize returned {type(chain).__name__}, not a Runnable")
+    return chain
+
+
+def _init_worker(chain_class: str, chain_text: str) -> None:
+    global _chain
+    _chain = load_chain(chain_class, chain_text)
+
+
+def _run_request(request: dict) -> dict:
+    if "shm" in request:
+        shm = untracked_shared_memory(request["shm"])
+        try:
+            image = read_shared_memory(shm, request["shape"], request["dtype"])
+        finally:
+            shm.close()
+    else:
+        image = np.frombuffer(request["data"], dtype=np.dtype(request["dtype"])).reshape(request["shape"])
+    supported_types = getattr(_chain, "supported_types", None)
+    if supported_types is not None and ImageType.np not in supported_types:
+        image = convert_type(image, supported_types[0])  # eg. the PIL ops
+
+    # the deadline is absolute: CLOCK_MONOTONIC, which time.monotonic reads, is shared by every process on Linux
+    deadline = None if request.get("deadline") is None else Deadline(request["deadline"])
+    outputs = _chain.run(deadline=deadline, **{request["input_name"]: image})
+    output = np.ascontiguousarray(convert_type(outputs[request["output_name"]], ImageType.np))
+
+    response = {"shape": list(output.shape), "dtype": output.dtype.str}
+    if "shm" in request:
+        shm = untracked_shared_memory(create=True, size=max(output.nbytes, 1))
+        write_shared_memory(shm, output)
+        response["shm"] = shm.name
+        shm.close()
+    else:
+        response["data"] = output.tobytes()
+    return response
+
+
+def _unlink_response(response: dict) -> None:
+    # nobody is going to read this response, so free its shared memory
+    if "shm" in response:
+        shm = SharedMemory(name=response["shm"])
+        shm.close()
+        shm.unlink()
+
+
+def _discard_response(future: Future) -> None:
+    if not future.cancelled() and future.exception() is None:
+        _unlink_response(future.result())
+
+
+class _PoolDispatch(Runnable):
+    """Hands a request to the worker pool and waits for it, so a `DeadlineScheduler` with one
+    thread per worker decides the order in which queued requests reach the workers."""
+
+    def __init__(self, pool: ProcessPoolExecutor):
+        self.pool = pool
+
+    def _run(self, inputs: RunInput | None) -> RunOutput | None:
+        return self.pool.submit(_run_request, inputs["request"]).result()
+
+
+class ServerStats:
+    """Thread-safe request counters plus a sliding window of latencies for percentiles."""
+
+    def __init__(self, window: int = 10000):
+        self._lock = threading.Lock()
+        self._latencies: deque[float] = deque(maxlen=window)
+        self._started = time.monotonic()
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.in_flight = 0
+
+    def try_admit(self, max_queue_depth: int) -> bool:
+        with self._lock:
+            if self.in_flight >= max_queue_depth:
+                self.rejected += 1
+                return False
+            self.in_flight += 1
+            return True
+
+    def release(self, latency: float, ok: bool) -> None:
+        with self._lock:
+            self.in_flight -= 1
+            if ok:
+                self.completed += 1
+                self._latencies.append(latency)
+            else:
+                self.failed += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            latencies = np.array(self._latencies) * 1000
+            uptime = time.monotonic() - self._started
+            p50, p90, p99 = np.percentile(latencies, [50, 90, 99]) if len(latencies) else (0.0, 0.0, 0.0)
+            return {
+                "completed": self.completed,
+                "failed": self.failed,
+                "rejected": self.rejected,
+                "in_flight": self.in_flight,
+                "uptime_s": uptime,
+                "throughput_rps": self.completed / uptime if uptime > 0 else 0.0,
+                "latency_ms": {"p50": float(p50), "p90": float(p90), "p99": float(p99)},
+            }
+
+
+class _ChainRequestHandler(BaseHTTPRequestHandler):
+    server: "_ChainHTTPServer"
+
+    def log_message(self, format: str, *args) -> None:
+        if self.server.chain_server.verbose:
+            super().log_message(format, *args)
+
+    def _send_json(self, status: HTTPStatus, body: dict, headers: Optional[dict] = None) -> None:
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self) -> None:
+        if self.path == "/healthz":
+            self._send_json(HTTPStatus.OK, {"status": "ok"})
+        elif self.path == "/stats":
+            self._send_json(HTTPStatus.OK, self.server.chain_server.stats.snapshot())
+        else:
+            self._send_json(HTTPStatus.NOT_FOUND, {"error": f"Unknown path: {self.path}"})
+
+    def do_POST(self) -> None:
+        if self.path != "/run":
+            self._send_json(HTTPStatus.NOT_FOUND, {"error": f"Unknown path: {self.path}"})
+            return
+        chain_server = self.server.chain_server
+        length = int(self.headers.get("Content-Length", 0))
+        if length > chain_server.max_payload_bytes:
+            self._send_json(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, {"error": "Payload too large"})
+            return
+        body = self.rfile.read(length)
+        arrived = time.monotonic()
+
+        try:
+            if self.headers.get("Content-Type") == "application/json":
+                fields = json.loads(body)  # a shared memory descriptor
+                if not isinstance(fields, dict) or "shm" not in fields:
+                    raise ValueError("JSON requests must reference a shared memory segment")
+            else:
+                fields = {"shape": json.loads(self.headers["X-Shape"]), "dtype": self.headers["X-Dtype"]}
+                for name, header in (("input_name", "X-Input-Name"), ("output_name", "X-Output-Name"), ("deadline_ms", "X-Deadline-Ms")):
+                    if header in self.headers:
+                        fields[name] = self.headers[header]
+            # built field by field, so clients cannot pass anything else through to the worker
+            request = {
+                "shape": [int(n) for n in fields["shape"]],
+                "dtype": np.dtype(fields["dtype"]).str,
+                "input_name": str(fields.get("input_name", chain_server.input_name)),
+                "output_name": str(fields.get("output_name", chain_server.output_name)),
+            }
+            if "shm" in fields:
+                request["shm"] = str(fields["shm"])
+            else:
+                request["data"] = body
+            deadline_ms = fields.get("deadline_ms")
+            deadline = None if deadline_ms is None else Deadline(arrived + float(deadline_ms) / 1000)
+        except (ValueError, KeyError, TypeError) as e:
+            self._send_json(HTTPStatus.BAD_REQUEST, {"error": f"Malformed request: {e}"})
+            return
+
+        if not chain_server.stats.try_admit(chain_server.max_queue_depth):
+            self._send_json(HTTPStatus.SERVICE_UNAVAILABLE, {"error": "Queue is full"}, headers={"Retry-After": "1"})
+            return
+
+        start = time.monotonic()
+        timed_out = False
+
+        def release(future: Future) -> None:
+            # the slot stays taken until the worker is done, even if the client already got a 504
+            ok = not timed_out and not future.cancelled() and future.exception() is None
+            chain_server.stats.release(time.monotonic() - start, ok)
+
+        try:
+            if deadline is not None:
+                request["deadline"] = deadline.at
+            future = chain_server.scheduler.submit(chain_server.dispatch, deadline=deadline, request=request)
+        except Exception as e:
+            chain_server.stats.release(time.monotonic() - start, False)
+            self._send_json(HTTPStatus.INTERNAL_SERVER_ERROR, {"error": f"{type(e).__name__}: {e}"})
+            return
+        future.add_done_callback(release)
+        try:
+            response = future.result(timeout=chain_server.request_timeout)
+        except FutureTimeoutError:
+            timed_out = True
+            future.add_done_callback(_discard_response)
+            self._send_json(HTTPStatus.GATEWAY_TIMEOUT, {"error": "Request timed out"})
+            return
+        except Exception as e:
+            self._send_json(HTTPStatus.INTERNAL_SERVER_ERROR, {"error": f"{type(e).__name__}: {e}"})
+            return
+
+        try:
+            if "shm" in response:
+                self._send_json(HTTPStatus.OK, response)
+            else:
+                data = response["data"]
+                self.send_response(HTTPStatus.OK)
+                self.send_header("Content-Type", "application/octet-stream")
+                self.send_header("Content-Length", str(len(data)))
+                self.send_header("X-Shape", json.dumps(response["shape"]))
+                self.send_header("X-Dtype", response["dtype"])
+                self.end_headers()
+                self.wfile.write(data)
+        except ConnectionError:
+            # the client went away, so it will never unlink the output segment
+            _unlink_response(response)
+            self.close_connection = True
+
+
+class _ChainHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    chain_server: "ChainServer"
+
+
+class ChainServer:
+    """
+    Serves a serialized chain over HTTP from a pool of warm worker processes.
+
+    Each worker deserializes the chain once with `chain_class.deserialize(chain_text)`; the
+    server does it once up front too and raises TypeError if that does not give a Runnable.
+    `POST /run` accepts either a JSON shared memory descriptor (`{"shm", "shape", "dtype"}`,
+    see `ChainClient`) or a raw pixel body with `X-Shape` and `X-Dtype` headers, and
+    answers in kind, so images are never re-encoded. A `deadline_ms` field (or
+    `X-Deadline-Ms` header), counted from when the request was read, is passed to the chain
+    as its run deadline; queued requests reach the workers earliest deadline first, and
+    those without a deadline go last. Requests beyond
+    `max_queue_depth` in flight are rejected with 503. `GET /stats` reports latency
+    percentiles and throughput.
+    """
+
+    def __init__(
+        self,
+        chain_class: str,
+        chain_text: str,
+        *,
+        host: str = "127.0.0.1",
+        port: int = 8000,
+        workers: Optional[int] = None,
+        max_queue_depth: int = 64,
+        max_payload_bytes: int = 512 * 1024 * 1024,
+        request_timeout: Optional[float] = None,
+        input_name: str = "input",
+        output_name: str = "output",
+        verbose: bool = False,
+    ):
+        load_chain(chain_class, chain_text)  # fail here rather than in every worker
+        self.chain_class = chain_class
+        self.chain_text = chain_text
+        self.workers = workers or os.cpu_count() or 1
+        self.max_queue_depth = max_queue_depth
+        self.max_payload_bytes = max_payload_bytes
+        self.request_timeout = request_timeout
+        self.input_name = input_name
+        self.output_name = output_name
+        self.verbose = verbose
+        self.stats = ServerStats()
+        self.pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker, initargs=(chain_class, chain_text))
+        self.dispatch = _PoolDispatch(self.pool)
+        self.scheduler = DeadlineScheduler(max_workers=self.workers)
+        self.httpd = _ChainHTTPServer((host, port), _ChainRequestHandler)
+        self.httpd.chain_server = self
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def serve_forever(self) -> None:
+        try:
+            self.httpd.serve_forever()
+        finally:
+            self.close()
+
+    def start(self) -> "ChainServer":
+        """Serve from a background thread, eg. in tests. Use `port=0` to pick a free port."""
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def close(self) -> None:
+        if self._thread is not None:
+            self.httpd.shutdown()
+            self._thread.join()
+            self._thread = None
+        self.httpd.server_close()
+        self.scheduler.shutdown(wait=True)
+        self.pool.shutdown(wait=True, cancel_futures=True)
+
+    def __enter__(self) -> "ChainServer":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -0,0 +1,74 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+
+class DeadlineExceeded(TimeoutError):
+    pass
+
+
+class Deadline:
+    """A point on the monotonic clock by which a request should be answered."""
+
+    __slots__ = ("at",)
+
+    def __init__(self, at: float):
+        self.at = at
+
+    @classmethod
+    def after(cls, seconds: float) -> "Deadline":
+        return cls(time.monotonic() + seconds)
+
+    def remaining(self) -> float:
+        return self.at - time.monotonic()
+
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def __lt__(self, other: "Deadline") -> bool:
+        return self.at < other.at
+
+    def __repr__(self) -> str:
+        return f"Deadline(remaining={self.remaining():.4f}s)"
+
+
+_current_deadline: ContextVar[Optional[Deadline]] = ContextVar("framechain_deadline", default=None)
+
+
+def current_deadline() -> Optional[Deadline]:
+    """The deadline of the run in progress, if any."""
+    return _current_deadline.get()
+
+
+@contextmanager
+def deadline_scope(deadline: Deadline | float | None) -> Iterator[Optional[Deadline]]:
+    """Make `deadline` (a `Deadline` or seconds from now) current for the enclosed runs.
+
+    A scope can only tighten the enclosing deadline, never extend it. Yields the
+    effective deadline, which is the enclosing one if `deadline` is None.
+    """
+    outer = _current_deadline.get()
+    if deadline is None:
+        yield outer
+        return
+    if not isinstance(deadline, Deadline):
+        deadline = Deadline.after(deadline)
+    if outer is not None and outer.at < deadline.at:
+        deadline = outer
+    token = _current_deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current_deadline.reset(token)
+
+
+class CostEstimate:
+    """An exponentially weighted moving average of how long something takes, in seconds."""
+
+    def __init__(self, initial: Optional[float] = None, alpha: float = 0.2):
+        self.value = initial
+        self.alpha = alpha
+
+    def update(self, seconds: float) -> None:
+        self.value = seconds if self.value is None else self.alpha * seconds + (1 - self.alpha) * self.value
@@ -7,8 +7,48 @@ class ImageType(Enum):
     np = "np"
 
 
-def convert_type(image, type: ImageType):
+def convert_type(image, type: ImageType, dtype=None):
     if type == ImageType.PIL:
-        return image if isinstance(image, PIL.Image.Image) else PIL.Image.Image.fromarray(image)
+        if dtype is not None and np.dtype(dtype) != image_dtype(image):
+            image = cast_image(image, dtype)
+        return image if isinstance(image, PIL.Image.Image) else PIL.Image.fromarray(image)
     if type == ImageType.np:
+        if dtype is not None:
+            return cast_image(image, dtype)
         return image if isinstance(image, np.ndarray) else np.array(image)
+
+
+def image_nbytes(image) -> int:
+    """The size of an image's decoded pixel data in bytes."""
+    if isinstance(image, np.ndarray):
+        return image.nbytes
+    w, h = image.size
+    return w * h * len(image.getbands())
+
+
+# dtypes of the PIL modes that do not hold 8 bit channels
+PIL_MODE_DTYPES = {"I": np.dtype(np.int32), "I;16": np.dtype(np.uint16), "F": np.dtype(np.float32)}
+
+
+def image_dtype(image) -> np.dtype | None:
+    """The dtype of an image's pixel data, or None if `image` is not an image."""
+    if isinstance(image, np.ndarray):
+        return image.dtype
+    if isinstance(image, PIL.Image.Image):
+        return PIL_MODE_DTYPES.get(image.mode, np.dtype(np.uint8))
+    return None
+
+
+def cast_image(image, dtype) -> np.ndarray:
+    """Cast an image's pixel data to `dtype`, rounding and clipping when narrowing to an integer type.
+
+    Values keep their range (eg. 0-255 for 8 bit images), they are not normalized.
+    """
+    dtype = np.dtype(dtype)
+    array = np.asarray(image)
+    if array.dtype == dtype:
+        return array
+    if np.issubdtype(dtype, np.integer) and not np.issubdtype(array.dtype, np.integer):
+        info = np.iinfo(dtype)
+        array = np.clip(np.rint(array), info.min, info.max)
+    return array.astype(dtype, copy=False)
@@ -0,0 +1,131 @@
+import warnings
+from typing import Optional
+
+import numpy as np
+import PIL.Image
+from pydantic import BaseModel
+
+from framechain.utils.image_type import ImageType, cast_image, convert_type, image_dtype
+
+
+def declared_names(runnable, attr: str) -> Optional[set[str]]:
+    """The names a runnable declares in its `inputs` or `outputs` list (or those of its
+    children for a composite), or None if it does not declare them."""
+    names = getattr(runnable, attr, None)
+    if isinstance(names, list) and names:
+        return set(names)
+    children = getattr(runnable, "runnables", None)
+    if not children:
+        return None
+    declared = set()
+    for child in children:
+        child_names = declared_names(child, attr)
+        if child_names is None:
+            return None
+        declared |= child_names
+    return declared
+
+
+def looks_like_image(value) -> bool:
+    """Whether `value` is a PIL image or an HWC shaped array."""
+    if isinstance(value, PIL.Image.Image):
+        return True
+    return isinstance(value, np.ndarray) and value.ndim == 3 and value.shape[-1] in (1, 3, 4)
+
+
+def _fits(image, dtype) -> bool:
+    """Whether the values of `image` are within the range of `dtype`, if it is a float dtype."""
+    dtype = np.dtype(dtype)
+    if image is None or not np.issubdtype(dtype, np.floating):
+        return True
+    array = np.asarray(image)
+    if array.size == 0 or not np.issubdtype(array.dtype, np.number):
+        return True
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)  # all-NaN images
+        peak = max(abs(np.nanmax(array)), abs(np.nanmin(array)))
+    return bool(np.isnan(peak) or peak <= np.finfo(dtype).max)
+
+
+class PrecisionPolicy(BaseModel):
+    """
+    Decides which dtype images should have as they flow between the nodes of a composite.
+
+    Chains declare the dtypes they accept with the `supported_dtypes` class variable
+    (None means any), and the image types with `supported_types`. Only image values are
+    touched: the names a node declares in `inputs`, or PIL images and HWC shaped arrays for
+    nodes that declare none, so eg. float64 boxes or embeddings pass through as they are.
+
+    Before each node runs, every image input whose dtype the node does not support is cast
+    to the cheapest supported dtype: `storage_dtype` for integer data, `compute_dtype` for
+    floating point intermediates, and `high_precision_dtype` only when nothing narrower is
+    accepted or the values do not fit in `compute_dtype`'s range. Images a node already
+    supports keep their dtype, except that float64 is demoted since no op here needs it
+    unless it explicitly lists it. Inputs are also converted to an image type the node
+    supports. `finalize` casts the composite's image outputs to `output_dtype`, keeping PIL
+    images as PIL.
+    """
+
+    storage_dtype: str = "uint8"
+    compute_dtype: str = "float16"
+    high_precision_dtype: str = "float32"
+    output_dtype: Optional[str] = "uint8"
+
+    def target_dtype(self, current: np.dtype, supported: Optional[tuple[str, ...]], image=None) -> Optional[np.dtype]:
+        """The dtype to cast an image of dtype `current` to, or None to leave it as is.
+
+        If `image` is given, floating point dtypes whose range its values exceed are skipped.
+        """
+        current = np.dtype(current)
+        if supported is None:
+            if current != np.float64:
+                return None
+            return next((np.dtype(d) for d in (self.compute_dtype, self.high_precision_dtype) if _fits(image, d)), None)
+        supported = [np.dtype(d) for d in supported]
+        if current in supported:
+            return None
+        if np.issubdtype(current, np.floating):
+            preference = (self.compute_dtype, self.high_precision_dtype, self.storage_dtype)
+        else:
+            preference = (self.storage_dtype, self.compute_dtype, self.high_precision_dtype)
+        for candidate in preference:
+            if np.dtype(candidate) in supported and _fits(image, candidate):
+                return np.dtype(candidate)
+        return supported[0]
+
+    def prepare(self, runnable, inputs: dict) -> dict:
+        """Cast the image inputs of `runnable` to dtypes and types it supports, skipping casts that are not needed."""
+        supported = getattr(runnable, "supported_dtypes", None)
+        supported_types = getattr(runnable, "supported_types", None)
+        names = declared_names(runnable, "inputs")
+        prepared = {}
+        for name, value in inputs.items():
+            current = image_dtype(value)
+            if current is None or not (name in names if names is not None else looks_like_image(value)):
+                prepared[name] = value
+                continue
+            target = self.target_dtype(current, supported, value)
+            image_type = ImageType.PIL if isinstance(value, PIL.Image.Image) else ImageType.np
+            if supported_types is not None and image_type not in supported_types:
+                image_type = supported_types[0]
+            prepared[name] = value if target is None and image_type == ImageType.np else convert_type(value, image_type, dtype=target)
+        return prepared
+
+    def finalize(self, outputs: dict | None, names: Optional[set[str]] = None) -> dict | None:
+        """Cast the image outputs of a composite to `output_dtype`.
+
+        `names` are the outputs the composite declares; without them only PIL images and HWC
+        shaped arrays are cast.
+        """
+        if outputs is None or self.output_dtype is None:
+            return outputs
+        output_dtype = np.dtype(self.output_dtype)
+        finalized = {}
+        for name, value in outputs.items():
+            current = image_dtype(value)
+            if current is None or current == output_dtype or not (name in names if names is not None else looks_like_image(value)):
+                finalized[name] = value
+            else:
+                image_type = ImageType.PIL if isinstance(value, PIL.Image.Image) else ImageType.np
+                finalized[name] = convert_type(value, image_type, dtype=output_dtype)
+        return finalized
@@ -2,7 +2,7 @@ from enum import Enum
 from typing import Literal, Optional
 import cv2
 
-from framechain.schema import Size
+from framechain.utils.types import Size
 
 
 class ScalingMode(Enum):
@@ -0,0 +1,88 @@
+import os
+
+import numpy as np
+import PIL.Image
+import pytest
+
+from framechain.io.dataset import DatasetReader, DatasetWriter, NHWCDataset, NHWCDatasetWriter
+from framechain.ops import Resize
+
+
+def _write(path, images, **kwargs):
+    with NHWCDatasetWriter(str(path), **kwargs) as writer:
+        for i, image in enumerate(images):
+            writer.append(image, id=f"img{i}")
+
+
+def test_round_trip_is_zero_copy(tmp_path):
+    _write(tmp_path / "ds", [np.full((100, 70, 3), i, np.uint8) for i in range(3)] + [np.full((30, 30), 9, np.uint8)])
+    dataset = NHWCDataset(str(tmp_path / "ds"))
+    assert len(dataset) == 4
+    assert dataset.ids == ["img0", "img1", "img2", "img3"]
+    assert dataset["img1"].shape == (100, 70, 3) and dataset["img1"].max() == 1
+    assert dataset[3].shape == (30, 30, 1)
+    assert [image[0, 0, 0] for image in dataset[0:2]] == [0, 1]
+    assert np.shares_memory(dataset[1], dataset.buckets[0])
+
+
+def test_overwrite_swaps_in_a_complete_dataset(tmp_path):
+    path = tmp_path / "ds"
+    _write(path, [np.zeros((100, 100, 3), np.uint8)] * 3)
+    with pytest.raises(FileExistsError):
+        NHWCDatasetWriter(str(path))
+
+    writer = NHWCDatasetWriter(str(path), overwrite=True)
+    writer.append(np.ones((10, 10, 3), np.uint8))
+    # the old dataset stays readable until the new one is finished
+    assert len(NHWCDataset(str(path))) == 3
+    writer.close()
+
+    dataset = NHWCDataset(str(path))
+    assert len(dataset) == 1 and dataset[0].max() == 1
+    assert sorted(os.listdir(path)) == ["bucket_64x64x3.bin", "index.json"]
+    # path is swapped atomically as a symlink, and the previous version is removed
+    assert os.path.islink(path)
+    assert sorted(os.listdir(tmp_path)) == sorted(["ds", os.readlink(path)])
+
+
+def test_overwrite_replaces_a_plain_directory(tmp_path):
+    path = tmp_path / "ds"
+    path.mkdir()
+    _write(path, [np.full((10, 10, 3), 4, np.uint8)])
+    assert os.path.islink(path) and NHWCDataset(str(path))[0].max() == 4
+    assert sorted(os.listdir(tmp_path)) == sorted(["ds", os.readlink(path)])
+
+
+def test_open_readers_keep_the_version_they_opened(tmp_path):
+    path = tmp_path / "ds"
+    _write(path, [np.full((10, 10, 3), 1, np.uint8)])
+    before = NHWCDataset(str(path))
+    _write(path, [np.full((10, 10, 3), 2, np.uint8)], overwrite=True)
+    assert before[0].max() == 1 and NHWCDataset(str(path))[0].max() == 2
+
+
+def test_failed_write_leaves_existing_dataset(tmp_path):
+    path = tmp_path / "ds"
+    _write(path, [np.zeros((10, 10, 3), np.uint8)])
+    with pytest.raises(RuntimeError):
+        with NHWCDatasetWriter(str(path), overwrite=True) as writer:
+            writer.append(np.ones((10, 10, 3), np.uint8))
+            raise RuntimeError
+    assert NHWCDataset(str(path))[0].max() == 0
+    assert sorted(os.listdir(tmp_path)) == sorted(["ds", os.readlink(path)])
+
+
+def test_reader_and_writer_chains_plug_into_stream(tmp_path):
+    source, target = tmp_path / "source", tmp_path / "target"
+    _write(source, [np.full((16, 16, 3), i, np.uint8) for i in range(5)])
+
+    reader = DatasetReader(path=str(source), batch_size=2)
+    chain = Resize(width=8, height=4)
+    with DatasetWriter(path=str(target)) as writer:
+        batches = ([{**inputs, "input": PIL.Image.fromarray(inputs["input"])} for inputs in batch] for batch in reader.iter_batches())
+        assert writer.write_batches(chain.stream(batches)) == 5
+
+    dataset = NHWCDataset(str(target))
+    assert dataset.ids == ["img0", "img1", "img2", "img3", "img4"]
+    assert all(image.shape == (4, 8, 3) for image in dataset)
+    assert reader.run(input="img2")["input"].max() == 2
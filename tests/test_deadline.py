@@ -0,0 +1,84 @@
+import threading
+import time
+
+import pytest
+
+from framechain.chains.degradable import Degradable, optional
+from framechain.chains.scheduler import DeadlineScheduler
+from framechain.schema import Runnable
+from framechain.utils.deadline import Deadline, DeadlineExceeded, current_deadline, deadline_scope
+
+
+class Tag(Runnable):
+    def __init__(self, tag: str):
+        self.tag = tag
+
+    def _run(self, inputs):
+        return {**inputs, "tags": [*inputs.get("tags", []), self.tag]}
+
+
+def test_scopes_only_tighten_the_deadline():
+    with deadline_scope(1.0) as outer:
+        with deadline_scope(10.0) as inner:
+            assert inner is outer and current_deadline() is outer
+        with deadline_scope(0.5) as inner:
+            assert inner.at < outer.at
+    assert current_deadline() is None
+
+
+def test_degradable_falls_back_to_what_fits():
+    chain = Degradable(Tag("full"), Tag("half"), costs=[1.0, 0.01])
+    assert chain.run()["tags"] == ["full"]
+    assert chain.run(deadline=0.1)["tags"] == ["half"] and chain.last_choice == 1
+    assert chain.run(deadline=Deadline.after(-1))["tags"] == ["half"]
+
+    assert "tags" not in optional(Tag("extra"), cost=1.0).run(deadline=0.1)
+
+
+def test_degradable_retries_options_it_passed_over():
+    chain = Degradable(Tag("full"), Tag("half"), costs=[1.0, 0.01], decay=0.5)
+    choices = [chain.run(deadline=0.3)["tags"] for _ in range(3)]
+    # 1.0 -> 0.5 -> 0.25 fits, and the run replaces the stale estimate with a real measurement
+    assert choices == [["half"], ["half"], ["full"]]
+    assert chain._costs[0].value < 0.25
+
+
+def test_degradable_last_choice_is_per_thread():
+    chain = Degradable(Tag("full"), Tag("half"), costs=[1.0, 0.01], decay=0.0)
+    chain.run(deadline=0.1)
+    other = threading.Thread(target=chain.run)
+    other.start()
+    other.join()
+    assert chain.last_choice == 1
+
+
+def test_scheduler_runs_earliest_deadline_first():
+    started = threading.Event()
+    release = threading.Event()
+
+    class Block(Runnable):
+        def _run(self, inputs):
+            started.set()
+            release.wait()
+            return inputs
+
+    with DeadlineScheduler(max_workers=1) as scheduler:
+        scheduler.submit(Block())
+        started.wait()
+        order = []
+        futures = [
+            scheduler.submit(Tag("none")),
+            scheduler.submit(Tag("late"), deadline=10.0),
+            scheduler.submit(Tag("early"), deadline=5.0),
+        ]
+        for future in futures:
+            future.add_done_callback(lambda f: order.append(f.result()["tags"][0]))
+        release.set()
+    assert order == ["early", "late", "none"]
+
+
+def test_scheduler_can_drop_expired_requests():
+    with DeadlineScheduler(max_workers=1, drop_expired=True) as scheduler:
+        future = scheduler.submit(Tag("late"), deadline=Deadline(time.monotonic() - 1))
+        with pytest.raises(DeadlineExceeded):
+            future.result()
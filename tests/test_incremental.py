@@ -0,0 +1,74 @@
+import numpy as np
+import PIL.Image
+
+from framechain.chains.incremental import IncrementalSession, flatten_chain
+from framechain.chains.simple_chain import SimpleChain
+from framechain.io.sink import ImageSink
+from framechain.ops import GaussianBlur, Resize
+from framechain.schema import SequentialRunnables
+from framechain.utils.image_type import image_nbytes
+from framechain.utils.precision import PrecisionPolicy
+
+
+class Gain(SimpleChain):
+    factor: float
+
+    def _run(self, inputs):
+        return {**inputs, self.output_name: np.asarray(inputs[self.input_name]) * self.factor}
+
+
+def test_reruns_only_the_nodes_after_a_change():
+    image = PIL.Image.new("RGB", (64, 64), "red")
+    blur = GaussianBlur(radius=1, input_name="small", output_name="output")
+    session = IncrementalSession(Resize(width=32, height=32, output_name="small") | blur)
+    first = session.run(input=image)
+    assert session.last_recomputed == 2
+
+    assert session.run(input=image)["output"] is first["output"]
+    assert session.last_recomputed == 0
+
+    blur.radius = 2
+    session.run(input=image)
+    assert session.last_recomputed == 1
+
+
+def test_pass_through_images_are_counted_once():
+    image = PIL.Image.new("RGB", (256, 256))
+    chain = Resize(width=128, height=128, output_name="a") | Resize(width=64, height=64, output_name="b") | Resize(width=32, height=32, output_name="c")
+    session = IncrementalSession(chain)
+    outputs = session.run(input=image)
+    assert session.cached_bytes == sum(image_nbytes(v) for v in outputs.values())
+
+    session.memory_budget = session.cached_bytes
+    session.run(input=image)
+    assert session.last_recomputed == 0
+
+
+def test_applies_the_precision_policy_of_composites():
+    image = np.full((8, 8, 3), 100, dtype=np.uint8)
+    inner = SequentialRunnables(Gain(factor=1.5, output_name="input"), Gain(factor=0.5), precision=PrecisionPolicy(output_dtype="float32"))
+    chain = SequentialRunnables(inner, Gain(factor=2.0, input_name="output"), precision=PrecisionPolicy())
+    assert len(flatten_chain(chain)) == 3
+
+    expected = chain.run(input=image)["output"]
+    actual = IncrementalSession(chain).run(input=image)["output"]
+    assert actual.dtype == expected.dtype == np.uint8
+    np.testing.assert_array_equal(actual, expected)
+
+
+def test_returns_a_copy_of_the_cached_outputs():
+    image = PIL.Image.new("RGB", (16, 16))
+    session = IncrementalSession(Resize(width=8, height=8))
+    session.run(input=image).pop("output")
+    assert set(session.run(input=image)) == {"input", "output"}
+
+
+def test_sinks_run_every_time(tmp_path):
+    image = PIL.Image.new("RGB", (16, 16))
+    sink = ImageSink(directory=str(tmp_path))
+    session = IncrementalSession(Resize(width=8, height=8) | sink)
+    assert session.run(input=image)["index"] == 0
+    assert session.run(input=image)["index"] == 1
+    assert session.last_recomputed == 1
+    sink.close()
+    assert len(list(tmp_path.iterdir())) == 2
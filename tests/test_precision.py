@@ -0,0 +1,49 @@
+import numpy as np
+import PIL.Image
+
+from framechain.ops import GaussianBlur, Resize
+from framechain.schema import SequentialRunnables
+from framechain.utils.precision import PrecisionPolicy
+
+
+def test_prepare_converts_images_for_pil_ops():
+    image = np.full((16, 16, 3), 127.6)
+    chain = SequentialRunnables(Resize(width=8, height=8, output_name="input"), GaussianBlur(radius=1), precision=PrecisionPolicy())
+    output = chain.run(input=image)["output"]
+    assert isinstance(output, PIL.Image.Image)
+    assert output.size == (8, 8) and np.asarray(output)[0, 0, 0] == 128
+
+
+def test_non_image_values_pass_through():
+    boxes = np.array([[0.25, 0.5, 10.75, 300.5]])
+    embedding = np.linspace(-1.0, 1.0, 512)
+    policy = PrecisionPolicy()
+    resize = Resize(width=8, height=8)
+    prepared = policy.prepare(resize, {"input": PIL.Image.new("RGB", (16, 16)), "boxes": boxes, "embedding": embedding})
+    assert prepared["boxes"] is boxes and prepared["embedding"] is embedding
+
+    chain = SequentialRunnables(resize, precision=policy)
+    outputs = chain.run(input=np.zeros((16, 16, 3), dtype=np.float32), boxes=boxes)
+    assert outputs["boxes"] is boxes
+    assert outputs["output"].size == (8, 8)
+
+
+def test_finalize_casts_undeclared_outputs_only_when_they_look_like_images():
+    policy = PrecisionPolicy()
+    hwc = np.full((4, 4, 3), 300.0)
+    scores = np.array([0.1, 0.9])
+    finalized = policy.finalize({"image": hwc, "scores": scores})
+    assert finalized["image"].dtype == np.uint8 and finalized["image"].max() == 255
+    assert finalized["scores"] is scores
+
+
+def test_float64_is_only_demoted_when_it_fits(recwarn):
+    policy = PrecisionPolicy()
+    depth = np.full((4, 4, 1), 70000.0)
+    assert policy.target_dtype(depth.dtype, None, depth) == np.float32
+    assert policy.target_dtype(depth.dtype, ("float16", "float32"), depth) == np.float32
+    assert policy.target_dtype(np.float64, None, np.full((4, 4, 1), 1.5)) == np.float16
+
+    prepared = policy.prepare(object(), {"depth": depth})["depth"]
+    assert prepared.dtype == np.float32 and np.isfinite(prepared).all() and prepared.max() == 70000.0
+    assert not [w for w in recwarn if issubclass(w.category, RuntimeWarning)]
@@ -0,0 +1,50 @@
+import PIL.Image
+import pytest
+
+from framechain.chains.degradable import Degradable, optional
+from framechain.ops import GaussianBlur, Resize
+from framechain.schema import ParallelRunnables, SequentialRunnables
+from framechain.utils.precision import PrecisionPolicy
+
+
+def test_ops_round_trip_through_serialize():
+    resize = Resize(width=10, height=5)
+    restored = Resize.deserialize(resize.serialize())
+    assert restored == resize
+    assert restored.type_id == "framechain.ops.Resize"
+    assert restored.inputs == ["input"] and restored.outputs == ["output"]
+
+
+def test_composites_run_their_children():
+    image = PIL.Image.new("RGB", (40, 40))
+    chain = Resize(width=10, height=5, output_name="input") | GaussianBlur(radius=1)
+    assert isinstance(chain, SequentialRunnables)
+    assert chain.run(input=image)["output"].size == (10, 5)
+
+    both = Resize(width=10, height=5, output_name="small") & Resize(width=20, height=20, output_name="large")
+    assert isinstance(both, ParallelRunnables)
+    outputs = both.run(input=image)
+    assert outputs["small"].size == (10, 5) and outputs["large"].size == (20, 20)
+
+
+def test_composites_round_trip_through_serialize():
+    chain = SequentialRunnables(
+        Resize(width=10, height=5, output_name="input"),
+        optional(GaussianBlur(radius=1), cost=0.5) & Resize(width=2, height=2, output_name="thumb"),
+        precision=PrecisionPolicy(compute_dtype="float32"),
+    )
+    restored = SequentialRunnables.deserialize(chain.serialize())
+    assert restored.serialize() == chain.serialize()
+    assert isinstance(restored.runnables[1].runnables[0], Degradable)
+    assert restored.runnables[1].runnables[0].costs == [0.5, 0.0]
+    assert restored.precision == chain.precision
+
+    outputs = restored.run(input=PIL.Image.new("RGB", (40, 40)))
+    assert outputs["output"].size == (10, 5) and outputs["thumb"].size == (2, 2)
+
+
+def test_deserialize_rejects_types_that_are_not_runnables():
+    with pytest.raises(TypeError):
+        SequentialRunnables.deserialize('{"type_id": "framechain.utils.precision.PrecisionPolicy", "runnables": []}')
+    with pytest.raises(TypeError):
+        SequentialRunnables.deserialize('{"type_id": "framechain.schema.SequentialRunnables", "runnables": [{"type_id": "builtins.dict"}]}')
@@ -0,0 +1,175 @@
+import glob
+import json
+import socket
+import struct
+import threading
+import time
+import urllib.error
+import urllib.request
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+import PIL.Image
+import pytest
+
+from framechain.chains.simple_chain import SimpleChain
+from framechain.ops import AdjustContrast, GaussianBlur, Resize
+from framechain.serve.client import ChainClient
+from framechain.serve.server import ChainServer
+from framechain.utils.deadline import current_deadline
+
+
+class Sleep(SimpleChain):
+    seconds: float
+
+    def _run(self, inputs):
+        time.sleep(self.seconds)
+        return {**inputs, self.output_name: inputs[self.input_name]}
+
+
+class NotAChain:
+    @classmethod
+    def deserialize(cls, text):
+        return None
+
+
+def _segments() -> set[str]:
+    return set(glob.glob("/dev/shm/psm_*"))
+
+
+@pytest.mark.parametrize("use_shared_memory", [True, False])
+def test_round_trip(use_shared_memory):
+    before = _segments()
+    image = np.random.default_rng(0).integers(0, 256, (24, 32, 3), dtype=np.uint8)
+    with ChainServer("framechain.ops:Resize", Resize(width=16, height=8).serialize(), port=0, workers=1) as server:
+        client = ChainClient(server.url, use_shared_memory=use_shared_memory, timeout=30)
+        output = client.run(image)
+        assert output.shape == (8, 16, 3) and output.dtype == np.uint8
+        stats = client.stats()
+        assert stats["completed"] == 1 and stats["in_flight"] == 0
+    assert _segments() == before
+
+
+@pytest.mark.parametrize("use_shared_memory", [True, False])
+def test_serves_multi_op_chains(use_shared_memory):
+    chain = Resize(width=16, height=8, output_name="input") | GaussianBlur(radius=1) | AdjustContrast(factor=1.5, input_name="output")
+    image = np.random.default_rng(0).integers(0, 256, (24, 32, 3), dtype=np.uint8)
+    expected = np.asarray(chain.run(input=PIL.Image.fromarray(image))["output"])
+    with ChainServer("framechain.schema:SequentialRunnables", chain.serialize(), port=0, workers=1) as server:
+        output = ChainClient(server.url, use_shared_memory=use_shared_memory, timeout=30).run(image)
+    np.testing.assert_array_equal(output, expected)
+
+
+def test_rejects_requests_beyond_the_queue_depth():
+    with ChainServer("framechain.ops:Resize", Resize(width=4, height=4).serialize(), port=0, workers=1, max_queue_depth=0) as server:
+        with pytest.raises(urllib.error.HTTPError) as e:
+            ChainClient(server.url, use_shared_memory=False, timeout=30).run(np.zeros((8, 8, 3), dtype=np.uint8))
+        assert e.value.code == 503
+        assert e.value.headers["Retry-After"] == "1"
+
+
+def test_timed_out_requests_keep_their_slot_until_the_worker_is_done():
+    before = _segments()
+    with ChainServer(f"{__name__}:Sleep", Sleep(seconds=1.0).serialize(), port=0, workers=1, request_timeout=0.1) as server:
+        client = ChainClient(server.url, timeout=30)
+        with pytest.raises(urllib.error.HTTPError) as e:
+            client.run(np.zeros((8, 8, 3), dtype=np.uint8))
+        assert e.value.code == 504
+        assert client.stats()["in_flight"] == 1
+
+        for _ in range(100):
+            stats = client.stats()
+            if stats["in_flight"] == 0:
+                break
+            time.sleep(0.05)
+        assert stats["in_flight"] == 0 and stats["failed"] == 1 and stats["completed"] == 0
+        time.sleep(0.1)  # let the done callback unlink the orphaned output segment
+    assert _segments() == before
+
+
+def test_rejects_classes_that_do_not_deserialize_to_a_runnable():
+    with pytest.raises(TypeError, match="not a Runnable"):
+        ChainServer(f"{__name__}:NotAChain", json.dumps({}), port=0)
+
+
+class DeadlineProbe(SimpleChain):
+    """Outputs [time left until the deadline, time the run started] after sleeping."""
+
+    seconds: float
+
+    def _run(self, inputs):
+        deadline = current_deadline()
+        probe = np.array([[[deadline.remaining() if deadline else np.inf, time.monotonic()]]])
+        time.sleep(self.seconds)
+        return {**inputs, self.output_name: probe}
+
+
+def test_queued_requests_keep_their_deadline_and_run_earliest_deadline_first():
+    image = np.zeros((1, 1, 1), dtype=np.uint8)
+    with ChainServer(f"{__name__}:DeadlineProbe", DeadlineProbe(seconds=0.5).serialize(), port=0, workers=1) as server:
+        client = ChainClient(server.url, timeout=30)
+        client.run(image)  # warm the worker up
+
+        results = {}
+
+        def run(name, deadline=None):
+            results[name] = client.run(image, deadline=deadline)[0, 0]
+
+        threads = [threading.Thread(target=run, args=("blocker",))]
+        threads[0].start()
+        time.sleep(0.1)
+        for name, deadline in (("late", 20.0), ("early", 10.0)):
+            threads.append(threading.Thread(target=run, args=(name, deadline)))
+            threads[-1].start()
+            time.sleep(0.05)
+        for thread in threads:
+            thread.join()
+
+    assert results["early"][1] < results["late"][1]
+    # the time spent queued behind the other requests counts against the deadline
+    assert results["early"][0] < 10.0 - 0.2
+
+
+def _post_shm(url: str, shm: SharedMemory, array: np.ndarray, **fields) -> dict:
+    body = {"shm": shm.name, "shape": list(array.shape), "dtype": array.dtype.str, **fields}
+    request = urllib.request.Request(f"{url}/run", data=json.dumps(body).encode(), headers={"Content-Type": "application/json"})
+    with urllib.request.urlopen(request, timeout=30) as response:
+        return json.loads(response.read())
+
+
+def test_clients_cannot_set_worker_fields_directly():
+    image = np.zeros((1, 1, 1), dtype=np.uint8)
+    shm = SharedMemory(create=True, size=1)
+    with ChainServer(f"{__name__}:DeadlineProbe", DeadlineProbe(seconds=0).serialize(), port=0, workers=1) as server:
+        result = _post_shm(server.url, shm, image, deadline=time.monotonic() - 100)
+    shm.close()
+    shm.unlink()
+    output = SharedMemory(name=result["shm"])
+    probe = np.ndarray(result["shape"], dtype=result["dtype"], buffer=output.buf)[0, 0].copy()
+    output.close()
+    output.unlink()
+    assert probe[0] == np.inf
+
+
+def test_responses_to_disconnected_clients_are_unlinked():
+    before = _segments()
+    image = np.zeros((4, 4, 3), dtype=np.uint8)
+    shm = SharedMemory(create=True, size=image.nbytes)
+    with ChainServer(f"{__name__}:Sleep", Sleep(seconds=0.3).serialize(), port=0, workers=1) as server:
+        # start the worker first, or it would be forked holding a copy of our socket
+        ChainClient(server.url, timeout=30).run(image)
+        host, port = server.httpd.server_address[:2]
+        body = json.dumps({"shm": shm.name, "shape": list(image.shape), "dtype": image.dtype.str}).encode()
+        with socket.create_connection((host, port)) as conn:
+            conn.sendall(b"POST /run HTTP/1.1\r\nHost: x\r\nContent-Type: application/json\r\nContent-Length: %d\r\n\r\n" % len(body) + body)
+            time.sleep(0.05)
+            # reset the connection instead of closing it gracefully, so the server's reply fails
+            conn.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack("ii", 1, 0))
+        for _ in range(100):
+            if server.stats.snapshot()["in_flight"] == 0:
+                break
+            time.sleep(0.05)
+        time.sleep(0.2)
+    shm.close()
+    shm.unlink()
+    assert _segments() == before
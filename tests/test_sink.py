@@ -0,0 +1,89 @@
+import threading
+import time
+
+import numpy as np
+import PIL.Image
+import pytest
+
+from framechain.io.sink import FORMAT_PRESETS, ImageFormat, ImageSink, encode_image
+from framechain.ops import Resize
+
+
+def test_encode_image_formats():
+    image = np.full((8, 8, 3), 7, np.uint8)
+    assert encode_image(image, format=ImageFormat.PNG)[:4] == b"\x89PNG"
+    assert encode_image(image, format=ImageFormat.JPEG, **FORMAT_PRESETS["fast"][ImageFormat.JPEG])[:2] == b"\xff\xd8"
+    assert encode_image(image, format=ImageFormat.NPY)[:6] == b"\x93NUMPY"
+
+
+def test_sink_writes_files_and_memory_map(tmp_path):
+    with ImageSink(directory=str(tmp_path / "out"), format=ImageFormat.WEBP, mmap_path=str(tmp_path / "raw.npy"), mmap_shape=(4, 8, 8, 3), max_inflight_bytes=300) as sink:
+        indices = [sink.run(output=np.full((8, 8, 3), i, np.uint8))["index"] for i in range(4)]
+    assert indices == [0, 1, 2, 3]
+    assert sorted(p.name for p in (tmp_path / "out").iterdir()) == [f"{i:08d}.webp" for i in range(4)]
+    assert np.load(tmp_path / "raw.npy")[:, 0, 0, 0].tolist() == [0, 1, 2, 3]
+
+
+def test_sink_stores_the_upstream_output(tmp_path):
+    chain = Resize(width=4, height=2) | ImageSink(mmap_path=str(tmp_path / "raw.npy"), mmap_shape=(1, 2, 4, 3))
+    chain.run(input=PIL.Image.new("RGB", (16, 16), (1, 2, 3)))
+    chain.runnables[-1].close()
+    assert np.load(tmp_path / "raw.npy")[0, 0, 0].tolist() == [1, 2, 3]
+
+
+def test_write_errors_surface_on_flush(tmp_path):
+    sink = ImageSink(mmap_path=str(tmp_path / "raw.npy"), mmap_shape=(1, 4, 4, 3))
+    sink.run(output=np.zeros((8, 8, 3), np.uint8))
+    with pytest.raises(ValueError):
+        sink.close()
+
+
+def test_sink_refuses_writes_after_close(tmp_path):
+    sink = ImageSink(mmap_path=str(tmp_path / "raw.npy"), mmap_shape=(2, 2, 2, 3))
+    sink.run(output=np.full((2, 2, 3), 9, np.uint8))
+    sink.close()
+    with pytest.raises(ValueError, match="closed"):
+        sink.run(output=np.zeros((2, 2, 3), np.uint8))
+    assert np.load(tmp_path / "raw.npy")[0].max() == 9
+
+
+@pytest.mark.parametrize("shape", [(4, 4, 1), (1, 4, 3)])
+def test_memory_map_rejects_images_that_would_broadcast(tmp_path, shape):
+    sink = ImageSink(mmap_path=str(tmp_path / "raw.npy"), mmap_shape=(1, 4, 4, 3))
+    sink.run(output=np.full(shape, 5, np.uint8))
+    with pytest.raises(ValueError, match="shape"):
+        sink.close()
+    assert np.load(tmp_path / "raw.npy").max() == 0
+
+
+def test_memory_map_clips_float_images(tmp_path):
+    with ImageSink(mmap_path=str(tmp_path / "raw.npy"), mmap_shape=(1, 1, 2, 1)) as sink:
+        sink.run(output=np.array([[[-3.0], [300.4]]]))
+    assert np.load(tmp_path / "raw.npy")[0, 0, :, 0].tolist() == [0, 255]
+
+
+def test_concurrent_first_runs_open_the_memory_map_once(tmp_path, monkeypatch):
+    opened = []
+    open_memmap = np.lib.format.open_memmap
+
+    def counting_open_memmap(*args, **kwargs):
+        opened.append(args)
+        time.sleep(0.05)  # widen the window for a second thread to slip in
+        return open_memmap(*args, **kwargs)
+
+    monkeypatch.setattr(np.lib.format, "open_memmap", counting_open_memmap)
+    sink = ImageSink(mmap_path=str(tmp_path / "raw.npy"), mmap_shape=(8, 2, 2, 3))
+    barrier = threading.Barrier(8)
+
+    def run(i):
+        barrier.wait()
+        sink.run(output=np.full((2, 2, 3), i + 1, np.uint8))
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    sink.close()
+    assert len(opened) == 1
+    assert sorted(np.load(tmp_path / "raw.npy")[:, 0, 0, 0].tolist()) == list(range(1, 9))
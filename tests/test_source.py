@@ -0,0 +1,46 @@
+import io
+
+import PIL.Image
+import pytest
+
+from framechain.io.source import ImageSource, decode_image, infer_draft_size
+from framechain.ops import Crop, GaussianBlur, Resize
+
+
+def _jpeg(size=(800, 600)) -> bytes:
+    buffer = io.BytesIO()
+    PIL.Image.new("RGB", size, (10, 200, 30)).save(buffer, "JPEG")
+    return buffer.getvalue()
+
+
+def test_decode_image_uses_draft_mode_for_jpegs():
+    assert decode_image(_jpeg()).size == (800, 600)
+    # the smallest DCT reduction that still covers 64x64
+    assert decode_image(_jpeg(), draft_size=(64, 64)).size == (100, 75)
+    assert decode_image(_jpeg(), draft_size=(64, 64), mode="L").mode == "L"
+
+
+def test_infer_draft_size_only_from_a_leading_resize():
+    assert infer_draft_size(Resize(width=64, height=32) | GaussianBlur(radius=1)) == (32, 64)
+    assert infer_draft_size(Crop(left=0, top=0, right=10, bottom=10) | Resize(width=64, height=32)) is None
+
+
+def test_iter_batches_feeds_stream():
+    chain = Resize(width=64, height=64, output_name="input") | GaussianBlur(radius=1)
+    source = ImageSource(draft_size=infer_draft_size(chain), batch_size=2, prefetch=2)
+    outputs = list(chain.stream(source.iter_batches([_jpeg()] * 5)))
+    assert [len(batch) for batch in outputs] == [2, 2, 1]
+    assert all(o["output"].size == (64, 64) for batch in outputs for o in batch)
+
+
+def test_source_composes_with_pipe(tmp_path):
+    path = tmp_path / "image.jpg"
+    path.write_bytes(_jpeg())
+    chain = ImageSource(mode="L") | Resize(width=32, height=16)
+    output = chain.run(input=str(path))["output"]
+    assert output.size == (32, 16) and output.mode == "L"
+
+
+def test_iter_images_rejects_zero_prefetch():
+    with pytest.raises(ValueError):
+        list(ImageSource(prefetch=0).iter_images([_jpeg()]))